@@ -0,0 +1,280 @@
+import bisect
+import csv
+import math
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Local organizations, offices and events that /take-action can point people
+# to. Loaded once into memory from CSV (or SQLite) and indexed by policy tag,
+# geohash cell and event start time, so lookups never leave the process.
+ACTION_RESOURCES_CSV = os.getenv(
+    "ACTION_RESOURCES_CSV",
+    os.path.join(os.path.dirname(__file__), "sample_data", "action_resources.csv"),
+)
+ACTION_RESOURCES_DB = os.getenv("ACTION_RESOURCES_DB")
+ACTION_EVENT_HORIZON_DAYS = int(os.getenv("ACTION_EVENT_HORIZON_DAYS", 60))
+
+# Coarse-to-fine geohash precisions kept in the index. Precision 5 cells are
+# roughly 5 km across, precision 2 cells roughly 1,250 km.
+_PRECISIONS = (5, 4, 3, 2)
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Free-text locations the mobile app commonly sends, mapped to coordinates.
+_PLACES: Dict[str, Tuple[float, float]] = {
+    "manhattan": (40.7831, -73.9712),
+    "brooklyn": (40.6782, -73.9442),
+    "queens": (40.7282, -73.7949),
+    "bronx": (40.8448, -73.8648),
+    "staten island": (40.5795, -74.1502),
+    "new york city": (40.7128, -74.0060),
+    "nyc": (40.7128, -74.0060),
+    "albany": (42.6526, -73.7562),
+    "buffalo": (42.8864, -78.8784),
+    "rochester": (43.1566, -77.6088),
+    "syracuse": (43.0481, -76.1474),
+    "new york": (40.7128, -74.0060),
+}
+_LAT_LON = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
+
+@dataclass(frozen=True)
+class ActionResource:
+    id: str
+    name: str
+    kind: str  # "organization", "office" or "event"
+    tags: Tuple[str, ...]
+    url: Optional[str] = None
+    description: Optional[str] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+
+
+def geohash(lat: float, lon: float, precision: int) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def _cell_size(precision: int) -> Tuple[float, float]:
+    total_bits = precision * 5
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def _cell_and_neighbors(lat: float, lon: float, precision: int) -> List[str]:
+    dlat, dlon = _cell_size(precision)
+    cells = set()
+    for i in (-1, 0, 1):
+        for j in (-1, 0, 1):
+            nlat = max(-90.0, min(90.0, lat + i * dlat))
+            nlon = (lon + j * dlon + 180.0) % 360.0 - 180.0
+            cells.add(geohash(nlat, nlon, precision))
+    return list(cells)
+
+
+def _distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def parse_location(location: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Accepts "lat,lon" or a known place name such as "Brooklyn, NY"."""
+    if not location:
+        return None
+    match = _LAT_LON.match(location)
+    if match:
+        return float(match.group(1)), float(match.group(2))
+    lowered = location.lower()
+    for place, coords in _PLACES.items():
+        if place in lowered:
+            return coords
+    return None
+
+
+class ActionResourceIndex:
+    def __init__(self, resources: Iterable[ActionResource]):
+        # tag -> precision -> geohash cell -> resources with a location
+        self._cells: Dict[str, Dict[int, Dict[str, List[ActionResource]]]] = {}
+        # tag -> resources without a location (statewide, national, online)
+        self._anywhere: Dict[str, List[ActionResource]] = {}
+        # tag -> resources with a location, for requests that don't send one
+        self._located: Dict[str, List[ActionResource]] = {}
+        # tag -> events sorted by start time, with a parallel list of keys
+        self._events: Dict[str, List[ActionResource]] = {}
+        self._event_starts: Dict[str, List[datetime]] = {}
+
+        for resource in resources:
+            for tag in resource.tags:
+                if resource.kind == "event" and resource.starts_at:
+                    self._events.setdefault(tag, []).append(resource)
+                elif resource.lat is None or resource.lon is None:
+                    self._anywhere.setdefault(tag, []).append(resource)
+                else:
+                    self._located.setdefault(tag, []).append(resource)
+                    by_precision = self._cells.setdefault(tag, {})
+                    for precision in _PRECISIONS:
+                        cell = geohash(resource.lat, resource.lon, precision)
+                        by_precision.setdefault(precision, {}).setdefault(cell, []).append(resource)
+        for tag, events in self._events.items():
+            events.sort(key=lambda r: r.starts_at)
+            self._event_starts[tag] = [r.starts_at for r in events]
+
+    def _upcoming_events(self, tag: str, now: datetime) -> List[ActionResource]:
+        starts = self._event_starts.get(tag)
+        if not starts:
+            return []
+        # Start from events that began up to a day ago so ongoing ones still show.
+        lo = bisect.bisect_left(starts, now - timedelta(days=1))
+        hi = bisect.bisect_right(starts, now + timedelta(days=ACTION_EVENT_HORIZON_DAYS))
+        return [
+            event
+            for event in self._events[tag][lo:hi]
+            if (event.ends_at or event.starts_at + timedelta(days=1)) >= now
+        ]
+
+    def nearest(
+        self,
+        tags: Iterable[str],
+        location: Optional[Tuple[float, float]],
+        limit: int = 5,
+        now: Optional[datetime] = None,
+    ) -> List[Tuple[ActionResource, Optional[float]]]:
+        """
+        Nearest `limit` resources matching any of `tags`, as
+        (resource, distance_km). Located resources are searched outward from
+        the user's geohash cell, widening until enough are found; upcoming
+        events come from the time index; location-independent resources fill
+        any remaining slots. Without a location, located resources come last.
+        """
+        now = now or datetime.now(timezone.utc)
+        tags = [tag.upper() for tag in tags]
+        candidates: Dict[str, ActionResource] = {}
+
+        for tag in tags:
+            for event in self._upcoming_events(tag, now):
+                candidates[event.id] = event
+
+        if location:
+            lat, lon = location
+            for precision in _PRECISIONS:
+                for tag in tags:
+                    cells = self._cells.get(tag, {}).get(precision, {})
+                    for cell in _cell_and_neighbors(lat, lon, precision):
+                        for resource in cells.get(cell, []):
+                            candidates[resource.id] = resource
+                if len(candidates) >= limit:
+                    break
+
+        def _distance(resource: ActionResource) -> Optional[float]:
+            if location is None or resource.lat is None or resource.lon is None:
+                return None
+            return _distance_km(location[0], location[1], resource.lat, resource.lon)
+
+        ranked = sorted(
+            ((resource, _distance(resource)) for resource in candidates.values()),
+            key=lambda pair: (pair[1] is None, pair[1] or 0.0),
+        )[:limit]
+
+        fill_sources = [self._anywhere] if location else [self._anywhere, self._located]
+        seen = {resource.id for resource, _ in ranked}
+        for source in fill_sources:
+            for tag in tags:
+                for resource in source.get(tag, []):
+                    if len(ranked) >= limit:
+                        return ranked
+                    if resource.id not in seen:
+                        ranked.append((resource, None))
+                        seen.add(resource.id)
+        return ranked
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    return float(value) if value not in (None, "") else None
+
+
+def _from_row(row: Dict[str, Optional[str]]) -> ActionResource:
+    return ActionResource(
+        id=row["id"],
+        name=row["name"],
+        kind=(row.get("kind") or "organization").lower(),
+        tags=tuple(t.strip().upper() for t in (row.get("tags") or "").split(";") if t.strip()),
+        url=row.get("url") or None,
+        description=row.get("description") or None,
+        lat=_parse_float(row.get("lat")),
+        lon=_parse_float(row.get("lon")),
+        starts_at=_parse_time(row.get("starts_at")),
+        ends_at=_parse_time(row.get("ends_at")),
+    )
+
+
+def load_csv(path: str) -> List[ActionResource]:
+    """CSV columns: id,name,kind,tags,url,description,lat,lon,starts_at,ends_at (tags ';'-separated)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [_from_row(row) for row in csv.DictReader(f)]
+
+
+def load_sqlite(path: str) -> List[ActionResource]:
+    """Reads the same columns as the CSV from an `action_resources` table."""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute("SELECT * FROM action_resources").fetchall()
+    finally:
+        conn.close()
+    return [_from_row({k: (str(row[k]) if row[k] is not None else None) for k in row.keys()}) for row in rows]
+
+
+_index: Optional[ActionResourceIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> ActionResourceIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            if ACTION_RESOURCES_DB:
+                resources = load_sqlite(ACTION_RESOURCES_DB)
+            elif os.path.isfile(ACTION_RESOURCES_CSV):
+                resources = load_csv(ACTION_RESOURCES_CSV)
+            else:
+                resources = []
+            _index = ActionResourceIndex(resources)
+        return _index
+
+
+def reload_index() -> ActionResourceIndex:
+    global _index
+    with _index_lock:
+        _index = None
+    return get_index()
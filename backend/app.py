@@ -1,22 +1,62 @@
+import startup_report  # first, so it timestamps the start of app import
+import asyncio
+import hmac
 import os
+from dataclasses import asdict
 from datetime import datetime
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from typing import List
+from fastapi.responses import Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from models import (
     Story,
     StoryDetail,
+    StoryBatchItem,
+    StoryBatchRequest,
+    StoryPrefetchRequest,
+    ReadingLevel,
     ExplainPolicyRequest,
     ExplainPolicyResponse,
     TakeActionRequest,
     TakeActionResponse,
+    ActionResourceOut,
     ChatRequest,
     ChatResponse,
     Source,
     ShortVideo,
 )
-from azure_client import call_policy_explainer, call_story_expander
+from azure_client import (
+    call_policy_explainer_variants,
+    call_story_expander_variants,
+    export_pamphlet_cache,
+    import_pamphlet_cache,
+    search_index_version,
+)
 from chat_flow import run_chat
+import action_resources
+import catalog
+from circuit_breaker import breaker_states
+import deadlines
+import pdf_text
+import retrieval_cache
+import shared_cache
+import token_usage
+from extractive import is_degraded
+import warm_snapshot
+
+CHAT_CACHE_TTL_SECONDS = float(os.getenv("CHAT_CACHE_TTL_SECONDS", 3600))
+# Upper bounds on how many details one batch or prefetch request may ask for.
+STORY_BATCH_MAX_ITEMS = int(os.getenv("STORY_BATCH_MAX_ITEMS", 20))
+STORY_PREFETCH_MAX_ITEMS = int(os.getenv("STORY_PREFETCH_MAX_ITEMS", 8))
+TAKE_ACTION_MAX_RESOURCES = int(os.getenv("TAKE_ACTION_MAX_RESOURCES", 3))
+# Variants generated in the same completion as the one requested, so the
+# policy text is sent once rather than once per language and reading level.
+GENERATION_READING_LEVELS = [
+    level.strip() for level in os.getenv("GENERATION_READING_LEVELS", "default,simple").split(",") if level.strip()
+]
+EXPLAIN_VARIANT_LANGUAGES = [
+    lang.strip() for lang in os.getenv("EXPLAIN_VARIANT_LANGUAGES", "").split(",") if lang.strip()
+]
 
 app = FastAPI(
     title="CivicCompanion API",
@@ -202,50 +242,244 @@ DUMMY_STORIES = [
     },
 ]
 
+# Seed catalog; replaced by CATALOG_PATH / CATALOG_DATABASE_URL on startup
+# when configured, and hot-reloaded from there afterwards.
+catalog.install(catalog.build_snapshot(DUMMY_POLICIES, DUMMY_STORIES))
+
+# Strong references to background prefetches so they aren't garbage collected.
+_prefetch_tasks: set = set()
+
 SHORTS_DIR = os.getenv("SHORTS_DIR", os.path.join(os.path.dirname(__file__), "shorts"))
 if os.path.isdir(SHORTS_DIR):
     app.mount("/media/shorts", StaticFiles(directory=SHORTS_DIR), name="shorts")
 
+warm_snapshot.register_section(
+    "shared_cache",
+    lambda: shared_cache.get_cache().export_entries(),
+    lambda rows: shared_cache.get_cache().import_entries(rows),
+)
+warm_snapshot.register_section("pamphlets", export_pamphlet_cache, import_pamphlet_cache)
+
+
+async def _run_for_client(request: Request, work):
+    """
+    Await `work` for this request, cancelling it when the client disconnects
+    or the deadline from the X-Request-Deadline-Ms header passes. Shared-cache
+    fills started by `work` keep running so the next reader still benefits.
+    """
+    try:
+        return await deadlines.run_cancellable(request, work)
+    except deadlines.DeadlineExceeded:
+        raise HTTPException(status_code=504, detail="Request deadline exceeded.")
+    except deadlines.ClientDisconnected:
+        # Nobody is listening; the status is only for access logs.
+        raise HTTPException(status_code=499, detail="Client closed request.")
+
+
+@app.on_event("startup")
+async def record_startup():
+    # Restore warm caches before the server starts accepting requests.
+    await asyncio.to_thread(warm_snapshot.restore)
+    await asyncio.to_thread(action_resources.get_index)
+    await asyncio.to_thread(catalog.reload)
+    catalog.start_reloader()
+    retrieval_cache.start_polling(search_index_version)
+    warm_snapshot.start_periodic()
+    startup_report.mark_app_ready()
+
+
+@app.on_event("shutdown")
+async def save_warm_state():
+    catalog.stop_reloader()
+    retrieval_cache.stop_polling()
+    pdf_text.shutdown_executor()
+    await warm_snapshot.stop_periodic()
+
+
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "dependencies": breaker_states(),
+        "retrieval_cache": retrieval_cache.get_cache().stats(),
+    }
+
+
+@app.get("/health/startup")
+async def startup_health():
+    """Cold-start cost: app import time plus each lazily imported SDK."""
+    return startup_report.runtime_report()
+
+
+@app.get("/usage")
+async def usage_report(request: Request):
+    """
+    Token usage in the rolling window by endpoint, chat intent and deployment;
+    per-client usage too when called with the X-Admin-Key.
+    """
+    key = request.headers.get("x-admin-key")
+    is_admin = bool(
+        token_usage.USAGE_ADMIN_KEY
+        and key
+        and hmac.compare_digest(key.encode("utf-8"), token_usage.USAGE_ADMIN_KEY.encode("utf-8"))
+    )
+    return token_usage.report(include_clients=is_admin)
 
 
 @app.get("/stories", response_model=List[Story])
 async def get_stories():
     """
-    Returns a list of stories (policy-related updates) for the feed.
-    Later, this can query Azure Database for PostgreSQL or Azure AI Search.
+    Returns a list of stories (policy-related updates) for the feed,
+    pre-serialized once per catalog snapshot.
+    """
+    return Response(content=catalog.current().feed_json, media_type="application/json")
+
+def _story_detail_key(story: catalog.StoryRecord, reading_level: str) -> str:
+    # The fingerprint changes whenever the story or its policy is edited, so a
+    # catalog reload never serves a detail generated from the old text.
+    return shared_cache.make_key("story_detail", story.id, story.fingerprint, reading_level)
+
+
+async def _uncached_variants(requested, siblings, key_for) -> list:
+    """The requested variant first, then any sibling not already cached."""
+    variants = [requested]
+    for variant in siblings:
+        if variant not in variants and await shared_cache.load(key_for(variant)) is None:
+            variants.append(variant)
+    return variants
+
+
+def _story_detail_task(
+    snapshot: catalog.CatalogSnapshot, story: catalog.StoryRecord, reading_level: str
+):
+    """
+    Shared-cache fill for one story detail; keeps running if callers leave.
+    `story` must come from `snapshot`, so the policy text always matches the
+    fingerprint the detail is cached under.
     """
-    return DUMMY_STORIES
+    policy = snapshot.policies.get(story.policy_id)
+
+    def _key(level: str) -> str:
+        return _story_detail_key(story, level)
+
+    async def _expand() -> str:
+        policy_text = policy.text if policy else ""
+        levels = await _uncached_variants(reading_level, GENERATION_READING_LEVELS, _key)
+        expanded = await call_story_expander_variants(
+            story_title=story.title,
+            story_summary=story.summary,
+            policy_text=policy_text,
+            reading_levels=levels,
+        )
+        for level, text in expanded.items():
+            if level != reading_level and not is_degraded(text):
+                await shared_cache.store(_key(level), text)
+        return expanded[reading_level]
+
+    # Generated text lives in the shared cache rather than in the catalog so
+    # every gunicorn worker (and the next deploy) reuses the same generation.
+    # Degraded extractive text is served but not cached, and a client over its
+    # own token budget doesn't hand its degraded text to concurrent readers.
+    return shared_cache.get_or_create(
+        _key(reading_level),
+        _expand,
+        cache_if=lambda text: not is_degraded(text),
+        share=token_usage.client_budget_level() == token_usage.OK,
+    )
+
 
 @app.get("/stories/{story_id}", response_model=StoryDetail)
-async def get_story_detail(story_id: str, reading_level: str = "default"):
-    story = next((s for s in DUMMY_STORIES if s["id"] == story_id), None)
+async def get_story_detail(request: Request, story_id: str, reading_level: ReadingLevel = "default"):
+    token_usage.attribute_request("story_detail", request)
+    snapshot = catalog.current()
+    story = snapshot.stories_by_id.get(story_id)
     if not story:
         raise HTTPException(status_code=404, detail="Story not found.")
 
-    summary_key = "detailed_summary_simple" if reading_level == "simple" else "detailed_summary"
-    cached = story.get(summary_key)
-    if cached:
-        return {**story, "detailed_summary": cached}
+    detailed_text = await _run_for_client(
+        request, _story_detail_task(snapshot, story, reading_level)
+    )
+    return {**story.as_dict(), "detailed_summary": detailed_text}
 
-    policy = DUMMY_POLICIES.get(story["policy_id"])
-    policy_text = policy["text"] if policy else ""
 
-    detailed_text = await call_story_expander(
-        story_title=story["title"],
-        story_summary=story["summary"],
-        policy_text=policy_text,
-        reading_level=reading_level,
-    )
+@app.post("/stories/batch")
+async def get_story_details_batch(req: StoryBatchRequest, request: Request):
+    """
+    Fetch several story details (any mix of ids and reading levels) at once.
+    Streams newline-delimited JSON StoryBatchItem records: cached details
+    first, then generated ones in the order they finish.
+    """
+    token_usage.attribute_request("story_detail", request)
+    items = req.items[:STORY_BATCH_MAX_ITEMS]
+    snapshot = catalog.current()
+
+    async def _generate(story: catalog.StoryRecord, reading_level: str) -> StoryBatchItem:
+        try:
+            text = await _story_detail_task(snapshot, story, reading_level)
+        except Exception:
+            return StoryBatchItem(
+                story_id=story.id, reading_level=reading_level, error="generation_failed"
+            )
+        return StoryBatchItem(
+            story_id=story.id,
+            reading_level=reading_level,
+            detail=StoryDetail(**story.as_dict(), detailed_summary=text),
+        )
 
-    story[summary_key] = detailed_text
-    return {**story, "detailed_summary": detailed_text}
+    async def _stream():
+        pending = []
+        seen = set()
+        for item in items:
+            if (item.story_id, item.reading_level) in seen:
+                continue
+            seen.add((item.story_id, item.reading_level))
+            story = snapshot.stories_by_id.get(item.story_id)
+            if not story:
+                yield StoryBatchItem(
+                    story_id=item.story_id, reading_level=item.reading_level, error="not_found"
+                ).json() + "\n"
+                continue
+            cached = await shared_cache.load(_story_detail_key(story, item.reading_level))
+            if cached is not None:
+                yield StoryBatchItem(
+                    story_id=item.story_id,
+                    reading_level=item.reading_level,
+                    cached=True,
+                    detail=StoryDetail(**story.as_dict(), detailed_summary=cached),
+                ).json() + "\n"
+            else:
+                pending.append(_generate(story, item.reading_level))
+        for next_done in asyncio.as_completed(pending):
+            yield (await next_done).json() + "\n"
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+
+@app.post("/stories/prefetch", status_code=202)
+async def prefetch_story_details(req: StoryPrefetchRequest, request: Request):
+    """
+    Warm the detail cache for stories the client is showing, so a later tap
+    is a cache hit. Returns immediately; generation continues in the background.
+    """
+    token_usage.attribute_request("story_prefetch", request)
+    snapshot = catalog.current()
+    scheduled = 0
+    # Duplicates would only queue the same fill twice; ReadingLevel already
+    # limits each story to two generations.
+    for story_id in list(dict.fromkeys(req.story_ids))[:STORY_PREFETCH_MAX_ITEMS]:
+        story = snapshot.stories_by_id.get(story_id)
+        if not story:
+            continue
+        for reading_level in dict.fromkeys(req.reading_levels):
+            task = asyncio.create_task(_story_detail_task(snapshot, story, reading_level))
+            _prefetch_tasks.add(task)
+            task.add_done_callback(_prefetch_tasks.discard)
+            scheduled += 1
+    return {"scheduled": scheduled}
 
 
 @app.post("/explain-policy", response_model=ExplainPolicyResponse)
-async def explain_policy(req: ExplainPolicyRequest):
+async def explain_policy(req: ExplainPolicyRequest, request: Request):
     """
     Given a policy_id, return:
     - what the policy is
@@ -254,22 +488,48 @@ async def explain_policy(req: ExplainPolicyRequest):
 
     For now, it uses dummy data + a placeholder Azure OpenAI call.
     """
-    policy = DUMMY_POLICIES.get(req.policy_id)
+    token_usage.attribute_request("explain_policy", request)
+    policy = catalog.current().policies.get(req.policy_id)
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found.")
 
-    explanation_text = await call_policy_explainer(
-        policy_text=policy["text"],
-        user_role=req.user_role,
-        language=req.language,
-        reading_level=req.reading_level,
+    def _key(variant) -> str:
+        language, reading_level = variant
+        return shared_cache.make_key(
+            "explain_policy", policy.id, policy.fingerprint, req.user_role, language, reading_level
+        )
+
+    async def _explain() -> str:
+        requested = (req.language, req.reading_level)
+        siblings = [
+            (language, level)
+            for language in [req.language, *EXPLAIN_VARIANT_LANGUAGES]
+            for level in GENERATION_READING_LEVELS
+        ]
+        variants = await _uncached_variants(requested, siblings, _key)
+        explained = await call_policy_explainer_variants(
+            policy_text=policy.text, user_role=req.user_role, variants=variants
+        )
+        for variant, text in explained.items():
+            if variant != requested and not is_degraded(text):
+                await shared_cache.store(_key(variant), text)
+        return explained[requested]
+
+    explanation_text = await _run_for_client(
+        request,
+        shared_cache.get_or_create(
+            _key((req.language, req.reading_level)),
+            _explain,
+            cache_if=lambda text: not is_degraded(text),
+            share=token_usage.client_budget_level() == token_usage.OK,
+        ),
     )
 
     # For now, just reuse the same explanation in both sections.
     # Later, you can parse the model output into structured parts.
     return ExplainPolicyResponse(
-        policy_title=policy["title"],
-        what_is_this=policy["text"],
+        policy_title=policy.title,
+        what_is_this=policy.text,
         what_it_means_for_you=explanation_text,
         disclaimer=(
             "This explanation is generated by an AI system for educational "
@@ -278,48 +538,96 @@ async def explain_policy(req: ExplainPolicyRequest):
     )
 
 
+def _describe_action(resource: ActionResourceOut) -> str:
+    where = f" ({resource.distance_km} km away)" if resource.distance_km is not None else ""
+    if resource.kind == "event" and resource.starts_at:
+        return f"Attend {resource.name} on {resource.starts_at:%b %d}{where}."
+    verb = "Contact" if resource.kind == "office" else "Reach out to"
+    return f"{verb} {resource.name}{where} to learn how this applies to you."
+
+
 @app.post("/take-action", response_model=TakeActionResponse)
 async def take_action(req: TakeActionRequest):
     """
-    Suggest constructive, neutral actions the user can take related to a policy.
-    This will later use location + resources from your DB.
+    Suggest constructive, neutral actions the user can take related to a policy,
+    pointing to the nearest relevant local organizations, offices and events.
     """
-    policy = DUMMY_POLICIES.get(req.policy_id)
+    policy = catalog.current().policies.get(req.policy_id)
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found.")
 
-    # TODO: later, query DB for local orgs, contacts, events based on user_location.
-    actions = [
-        "Learn more from your local government or university housing office website.",
-        "Contact your student union or tenant advocacy group to understand your rights.",
-        "Attend a public meeting or info session about housing policies, if available.",
+    nearest = action_resources.get_index().nearest(
+        policy.tags,
+        action_resources.parse_location(req.user_location),
+        limit=TAKE_ACTION_MAX_RESOURCES,
+    )
+    resources = [
+        ActionResourceOut(
+            id=resource.id,
+            name=resource.name,
+            kind=resource.kind,
+            url=resource.url,
+            description=resource.description,
+            distance_km=round(distance, 1) if distance is not None else None,
+            starts_at=resource.starts_at,
+        )
+        for resource, distance in nearest
     ]
+    actions = [_describe_action(resource) for resource in resources]
+    if not actions:
+        actions = [
+            "Learn more from your local government or university housing office website.",
+            "Contact your student union or tenant advocacy group to understand your rights.",
+            "Attend a public meeting or info session about housing policies, if available.",
+        ]
 
     return TakeActionResponse(
-        policy_title=policy["title"],
+        policy_title=policy.title,
         actions=actions,
         disclaimer=(
             "These are general suggestions and may not apply to every situation. "
             "Always verify details with official sources."
         ),
+        resources=resources,
     )
 
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat(req: ChatRequest):
+async def chat(req: ChatRequest, request: Request):
     """
     Unified chat endpoint that routes to different tools based on detected intent.
     """
     if not req.message:
         raise HTTPException(status_code=400, detail="Message is required.")
+    token_usage.attribute_request("chat", request)
 
-    chat_result = await run_chat(req.message)
+    async def _answer() -> dict:
+        chat_result = await run_chat(req.message)
+        payload = asdict(chat_result)
+        payload["sources"] = [
+            s.dict() if hasattr(s, "dict") else s for s in chat_result.sources
+        ]
+        return payload
+
+    # Answers don't depend on conversation state, so identical questions share
+    # one. Not detached: an abandoned chat is cancelled rather than finished.
+    normalized_message = " ".join(req.message.lower().split())
+    chat_result = await _run_for_client(
+        request,
+        shared_cache.get_or_create(
+            shared_cache.make_key("chat", normalized_message),
+            _answer,
+            ttl=CHAT_CACHE_TTL_SECONDS,
+            detach=False,
+            cache_if=lambda payload: "extractive_summary" not in payload["tools_used"],
+        ),
+    )
     # Attach conversation id + timestamp so the client can thread messages.
     response = ChatResponse(
-        intent=chat_result.intent,
-        answer=chat_result.answer,
-        sources=[Source(**s.dict()) if hasattr(s, "dict") else s for s in chat_result.sources],
-        tools_used=chat_result.tools_used,
+        intent=chat_result["intent"],
+        answer=chat_result["answer"],
+        sources=[Source(**s) for s in chat_result["sources"]],
+        tools_used=chat_result["tools_used"],
         conversation_id=req.conversation_id,
         timestamp=datetime.utcnow(),
     )
@@ -0,0 +1,89 @@
+# Lazily-loaded adapters for the Azure SDKs. Nothing here imports an SDK at
+# module load: each factory imports its SDK the first time a configured
+# service is used, caches the client, and records the import cost.
+import importlib
+import sys
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+# Module name -> milliseconds spent importing it on first use.
+IMPORT_COSTS: Dict[str, float] = {}
+
+_clients: Dict[Tuple[str, ...], Any] = {}
+_lock = threading.Lock()
+
+
+def lazy_import(module_name: str) -> Any:
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    IMPORT_COSTS[module_name] = round((time.perf_counter() - started) * 1000, 2)
+    return module
+
+
+def sdk_attr(module_name: str, attr: str) -> Any:
+    """Fetch a class or enum (e.g. QueryType) from an SDK module on demand."""
+    return getattr(lazy_import(module_name), attr)
+
+
+def _cached_client(key: Tuple[str, ...], factory) -> Any:
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = factory()
+            _clients[key] = client
+        return client
+
+
+def _credential(key: str) -> Any:
+    return sdk_attr("azure.core.credentials", "AzureKeyCredential")(key)
+
+
+def openai_client(endpoint: str, api_key: str, api_version: str) -> Any:
+    # The async client, so a cancelled request also aborts its HTTP call
+    # instead of leaving a billed completion running in a worker thread.
+    return _cached_client(
+        ("openai", endpoint, api_version),
+        lambda: sdk_attr("openai", "AsyncAzureOpenAI")(
+            api_key=api_key, azure_endpoint=endpoint, api_version=api_version
+        ),
+    )
+
+
+def language_client(endpoint: str, key: str) -> Any:
+    return _cached_client(
+        ("language", endpoint),
+        lambda: sdk_attr("azure.ai.textanalytics", "TextAnalyticsClient")(
+            endpoint=endpoint, credential=_credential(key)
+        ),
+    )
+
+
+def document_analysis_client(endpoint: str, key: str) -> Any:
+    return _cached_client(
+        ("document_intelligence", endpoint),
+        lambda: sdk_attr("azure.ai.formrecognizer", "DocumentAnalysisClient")(
+            endpoint=endpoint, credential=_credential(key)
+        ),
+    )
+
+
+def search_client(endpoint: str, key: str, index_name: str) -> Any:
+    return _cached_client(
+        # Keyed by credential too: the index poll may use an admin key.
+        ("search", endpoint, index_name, key),
+        lambda: sdk_attr("azure.search.documents", "SearchClient")(
+            endpoint=endpoint, index_name=index_name, credential=_credential(key)
+        ),
+    )
+
+
+def content_safety_client(endpoint: str, key: str) -> Any:
+    return _cached_client(
+        ("content_safety", endpoint),
+        lambda: sdk_attr("azure.ai.contentsafety", "ContentSafetyClient")(
+            endpoint=endpoint, credential=_credential(key)
+        ),
+    )
@@ -1,83 +1,154 @@
 import asyncio
+import contextlib
+import hashlib
+import json
 import os
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from openai import AzureOpenAI
 
-# Azure SDKs
-from azure.core.credentials import AzureKeyCredential
-from azure.ai.textanalytics import TextAnalyticsClient, SingleLabelClassifyAction
-from azure.ai.formrecognizer import DocumentAnalysisClient
-from azure.search.documents import SearchClient
-from azure.search.documents.models import QueryType
-from azure.ai.contentsafety import ContentSafetyClient
-from azure.ai.contentsafety.models import AnalyzeTextOptions, TextCategory
+# Azure SDKs are imported lazily by the adapters, only once a configured
+# service is first used, to keep cold start cheap.
+import azure_adapters
+import deadlines
+import pdf_text
+import extractive
+import retrieval_cache
+import token_usage
+from circuit_breaker import OPEN, get_breaker
+from micro_batch import MicroBatcher
 
 load_dotenv()
 
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 AZURE_OPENAI_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT")
+# Cheaper deployment used once a token budget passes its soft limit.
+AZURE_OPENAI_FALLBACK_DEPLOYMENT = os.getenv("AZURE_OPENAI_FALLBACK_DEPLOYMENT")
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", 60))
+# Completions allowed in flight per worker before callers that have an
+# extractive fallback are served from it instead; 0 disables the limit.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 0))
 
 AZURE_LANGUAGE_ENDPOINT = os.getenv("AZURE_LANGUAGE_ENDPOINT")
 AZURE_LANGUAGE_KEY = os.getenv("AZURE_LANGUAGE_KEY")
 # Optional: custom single-label classification project + deployment
 AZURE_LANGUAGE_INTENT_PROJECT = os.getenv("AZURE_LANGUAGE_INTENT_PROJECT")
 AZURE_LANGUAGE_INTENT_DEPLOYMENT = os.getenv("AZURE_LANGUAGE_INTENT_DEPLOYMENT")
+# How long to hold a message so concurrent ones share a Language Service call.
+LANGUAGE_BATCH_WAIT_MS = float(os.getenv("LANGUAGE_BATCH_WAIT_MS", 5))
 
 AZURE_DOCINTEL_ENDPOINT = os.getenv("AZURE_DOCINTEL_ENDPOINT")
 AZURE_DOCINTEL_KEY = os.getenv("AZURE_DOCINTEL_KEY")
 DOCINTEL_PAMPHLET_DIR = os.getenv(
     "DOCINTEL_PAMPHLET_DIR", os.path.join(os.path.dirname(__file__), "sample_docs")
 )
+PAMPHLET_EXCERPT_CHARS = int(os.getenv("PAMPHLET_EXCERPT_CHARS", 2000))
 
 AZURE_SEARCH_ENDPOINT = os.getenv("AZURE_SEARCH_ENDPOINT")
 AZURE_SEARCH_KEY = os.getenv("AZURE_SEARCH_KEY")
 AZURE_SEARCH_POLICY_INDEX = os.getenv("AZURE_SEARCH_POLICY_INDEX")
+# Counting documents for retrieval-cache invalidation needs an admin key when
+# AZURE_SEARCH_KEY is a query key.
+AZURE_SEARCH_ADMIN_KEY = os.getenv("AZURE_SEARCH_ADMIN_KEY")
+SEARCH_INDEX_POLL_TIMEOUT_SECONDS = float(os.getenv("SEARCH_INDEX_POLL_TIMEOUT_SECONDS", 10))
 
 AZURE_CONTENT_SAFETY_ENDPOINT = os.getenv("AZURE_CONTENT_SAFETY_ENDPOINT")
 AZURE_CONTENT_SAFETY_KEY = os.getenv("AZURE_CONTENT_SAFETY_KEY")
 
+# Created here, with the completion timeout, rather than by whichever caller
+# first asks for it; llm_available() would otherwise give it the 5s default.
+_openai_breaker = get_breaker("openai", call_timeout=OPENAI_TIMEOUT_SECONDS)
+
+_llm_slots: Optional[asyncio.Semaphore] = (
+    asyncio.Semaphore(LLM_MAX_CONCURRENCY) if LLM_MAX_CONCURRENCY > 0 else None
+)
+
 BASE_SYSTEM_PROMPT = """
 You are CivicCompanion, an assistant that explains public policies in neutral,
 plain language. You avoid political advocacy and focus on helping people understand
 what a policy does and what it might mean for them.
 """
 
-_openai_client: Optional[AzureOpenAI] = None
+
+# Served, but not cached, by completions without an extractive tier once
+# their token budget is spent.
+_BUDGET_EXHAUSTED_ANSWER = extractive.ExtractiveAnswer(
+    "This feature has reached its usage limit for now. Please try again later."
+)
 
 
-def _get_openai_client() -> Optional[AzureOpenAI]:
-    global _openai_client
-    if _openai_client is not None:
-        return _openai_client
+def _get_openai_client() -> Optional[Any]:
     if not AZURE_OPENAI_ENDPOINT or not AZURE_OPENAI_API_KEY or not AZURE_OPENAI_DEPLOYMENT:
         return None
-    _openai_client = AzureOpenAI(
-        api_key=AZURE_OPENAI_API_KEY,
-        azure_endpoint=AZURE_OPENAI_ENDPOINT,
-        api_version="2024-02-15-preview",
+    return azure_adapters.openai_client(
+        AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_API_KEY, api_version="2024-02-15-preview"
     )
-    return _openai_client
 
 
-def _run_completion(
+def llm_available() -> bool:
+    """False when completions would be skipped: unconfigured, circuit open or at capacity."""
+    if not _get_openai_client():
+        return False
+    if _llm_slots is not None and _llm_slots.locked():
+        return False
+    return _openai_breaker.state != OPEN
+
+
+async def _run_completion(
     messages: List[Dict[str, str]],
     temperature: float = 0.4,
     max_tokens: int = 400,
     fallback: str = "Azure OpenAI is not configured yet.",
+    degraded_answer: Optional[Callable[[], str]] = None,
 ) -> str:
+    """
+    Run a chat completion. When `degraded_answer` is given, it supplies a local
+    degraded answer (an ExtractiveAnswer) whenever the LLM is unconfigured,
+    failing, its circuit is open, or LLM_MAX_CONCURRENCY calls are already
+    in flight, instead of waiting, erroring or returning `fallback`.
+
+    Token usage is recorded against the caller's token_usage attribution.
+    Near a budget the completion is shortened and moved to the fallback
+    deployment; past it, the degraded answer is served instead.
+    """
     client = _get_openai_client()
     if not client or not AZURE_OPENAI_DEPLOYMENT:
-        return fallback
-
-    response = client.chat.completions.create(
-        model=AZURE_OPENAI_DEPLOYMENT,
-        messages=messages,
-        temperature=temperature,
-        max_tokens=max_tokens,
-    )
+        # Marked degraded so callers that cache answers don't keep the notice.
+        return degraded_answer() if degraded_answer else extractive.ExtractiveAnswer(fallback)
+
+    deployment = AZURE_OPENAI_DEPLOYMENT
+    budget = token_usage.budget_level()
+    if budget == token_usage.EXHAUSTED:
+        return degraded_answer() if degraded_answer else _BUDGET_EXHAUSTED_ANSWER
+    if budget == token_usage.SOFT_LIMIT:
+        max_tokens = token_usage.downgraded_max_tokens(max_tokens)
+        deployment = AZURE_OPENAI_FALLBACK_DEPLOYMENT or deployment
+
+    if degraded_answer and not llm_available():
+        return degraded_answer()
+
+    # Don't start a completion nobody will wait for, and don't let one run
+    # past the request deadline. The client is async, so a cancelled request
+    # or a timeout aborts the HTTP call rather than leaving it running.
+    deadlines.check()
+    try:
+        async with _llm_slots or contextlib.nullcontext():
+            response = await _openai_breaker.call(
+                client.chat.completions.create,
+                model=deployment,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=deadlines.clamp_timeout(OPENAI_TIMEOUT_SECONDS),
+            )
+    except deadlines.DeadlineExceeded:
+        raise
+    except Exception:
+        if degraded_answer:
+            return degraded_answer()
+        raise
+    token_usage.record_response(response, deployment)
     return response.choices[0].message.content.strip()
 
 
@@ -107,11 +178,16 @@ Provide a clear, neutral explanation in {language}. Use 2–3 short paragraphs t
 - What might change for the reader
 """
 
-    return _run_completion(
+    return await _run_completion(
         [
             {"role": "system", "content": BASE_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt},
-        ]
+        ],
+        degraded_answer=lambda: extractive.summarize(
+            [("Policy text", policy_text)],
+            max_sentences=3 if reading_level == "simple" else 4,
+            cite_sources=False,
+        ),
     )
 
 
@@ -146,15 +222,250 @@ Requirements:
  - {reading_hint}
 """
 
-    return _run_completion(
+    return await _run_completion(
         [
             {"role": "system", "content": BASE_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt},
         ],
         max_tokens=500,
+        degraded_answer=lambda: extractive.summarize(
+            [(story_title, story_summary), ("Policy context", policy_text)],
+            query=story_title,
+            max_sentences=4 if reading_level == "simple" else 6,
+            cite_sources=False,
+        ),
     )
 
 
+# Cap on completion tokens for a single multi-variant call.
+MULTI_VARIANT_MAX_TOKENS = int(os.getenv("MULTI_VARIANT_MAX_TOKENS", 3000))
+
+_READING_HINTS = {
+    "simple": "a simplified reading level suitable for middle school students, with simple words and short sentences",
+    "default": "a general reading level suitable for adults, in concise, professional language",
+}
+
+
+def _parse_variants(raw: str, expected: List[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+    """
+    Parse {"variants": [{"language", "reading_level", "text"}, ...]} from a
+    completion, keeping only requested variants with non-empty text.
+    """
+    # Tolerate code fences or stray prose around the JSON object.
+    text = raw.strip()
+    try:
+        payload = json.loads(text[text.find("{"): text.rfind("}") + 1])
+    except ValueError:
+        return {}
+    wanted = set(expected)
+    parsed: Dict[Tuple[str, str], str] = {}
+    for item in payload.get("variants", []) if isinstance(payload, dict) else []:
+        if not isinstance(item, dict):
+            continue
+        key = (str(item.get("language", "")), str(item.get("reading_level", "")))
+        body = item.get("text")
+        if key in wanted and isinstance(body, str) and body.strip():
+            parsed[key] = body.strip()
+    return parsed
+
+
+def _variant_instructions(variants: List[Tuple[str, str]]) -> str:
+    lines = [
+        f'- language "{language}", reading_level "{level}": '
+        f"write in {language} at {_READING_HINTS.get(level, _READING_HINTS['default'])}."
+        for language, level in variants
+    ]
+    return "\n".join(lines)
+
+
+async def _generate_variants(
+    task_prompt: str,
+    variants: List[Tuple[str, str]],
+    max_tokens_each: int,
+) -> Dict[Tuple[str, str], str]:
+    """One completion that writes every variant; returns those that validated."""
+    if not llm_available():
+        return {}
+    user_prompt = f"""
+{task_prompt}
+
+Write one version of this text for each of the following variants:
+{_variant_instructions(variants)}
+
+Every version must carry the same facts; only the language and reading level change.
+Respond with JSON only, no commentary, in exactly this shape:
+{{"variants": [{{"language": "<language>", "reading_level": "<reading_level>", "text": "<the text>"}}]}}
+"""
+    try:
+        raw = await _run_completion(
+            [
+                {"role": "system", "content": BASE_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt},
+            ],
+            max_tokens=min(max_tokens_each * len(variants), MULTI_VARIANT_MAX_TOKENS),
+        )
+    except deadlines.DeadlineExceeded:
+        raise
+    except Exception:
+        # The per-variant calls below fall back on their own.
+        return {}
+    return _parse_variants(raw, variants)
+
+
+async def call_policy_explainer_variants(
+    policy_text: str,
+    user_role: str | None,
+    variants: List[Tuple[str, str]],
+) -> Dict[Tuple[str, str], str]:
+    """
+    Explain a policy for several (language, reading_level) variants with a
+    single completion, so the policy text is sent once. The first variant is
+    the one the caller needs: if the model leaves it out or garbles it, only
+    that one is generated on its own. Missing siblings are simply absent and
+    get generated when someone asks for them.
+    """
+    if token_usage.budget_level() != token_usage.OK:
+        # Near a token budget, only generate the variant that was asked for.
+        variants = variants[:1]
+    results: Dict[Tuple[str, str], str] = {}
+    if len(variants) > 1:
+        role_blurb = f"The person asking is a {user_role}." if user_role else ""
+        task_prompt = f"""
+{role_blurb}
+
+Here is the policy text to explain:
+\"\"\"{policy_text}\"\"\"
+
+Provide a clear, neutral explanation. Use 2–3 short paragraphs that cover:
+- What the policy does
+- Who it mainly affects
+- What might change for the reader
+"""
+        results = await _generate_variants(task_prompt, variants, max_tokens_each=400)
+    missing = [variant for variant in variants[:1] if variant not in results]
+    fallbacks = await asyncio.gather(
+        *(
+            call_policy_explainer(
+                policy_text=policy_text,
+                user_role=user_role,
+                language=language,
+                reading_level=level,
+            )
+            for language, level in missing
+        )
+    )
+    results.update(zip(missing, fallbacks))
+    return results
+
+
+async def call_story_expander_variants(
+    story_title: str,
+    story_summary: str,
+    policy_text: str,
+    reading_levels: List[str],
+) -> Dict[str, str]:
+    """
+    Expand a story at several reading levels with a single completion. As in
+    call_policy_explainer_variants, only the first (requested) level is
+    regenerated on its own when the combined output can't be used.
+    """
+    variants = [("en", level) for level in reading_levels]
+    if token_usage.budget_level() != token_usage.OK:
+        # Near a token budget, only generate the variant that was asked for.
+        variants = variants[:1]
+    results: Dict[Tuple[str, str], str] = {}
+    if len(variants) > 1:
+        task_prompt = f"""
+Write a 3-paragraph, neutral story for the CivicCompanion app. Do not include any title or header,
+just go straight into the story.
+
+Story title: {story_title}
+
+Short summary:
+{story_summary}
+
+Policy context (for reference only):
+{policy_text}
+
+Requirements:
+- Stay factual and accessible; avoid legal or political advice.
+- Mention why the story matters for everyday people or students.
+- Include any helpful context about what readers could look out for next.
+"""
+        results = await _generate_variants(task_prompt, variants, max_tokens_each=500)
+    missing = [level for language, level in variants[:1] if (language, level) not in results]
+    fallbacks = await asyncio.gather(
+        *(
+            call_story_expander(
+                story_title=story_title,
+                story_summary=story_summary,
+                policy_text=policy_text,
+                reading_level=level,
+            )
+            for level in missing
+        )
+    )
+    expanded = {level: text for (_, level), text in results.items()}
+    expanded.update(zip(missing, fallbacks))
+    return expanded
+
+
+def _first_category(doc_results: Any) -> Optional[str]:
+    for action_result in doc_results:
+        if getattr(action_result, "is_error", False):
+            continue
+        for doc_result in getattr(action_result, "documents_results", []):
+            classification = getattr(doc_result, "classification", None)
+            if classification and getattr(classification, "category", None):
+                return classification.category
+    return None
+
+
+def _classify_batch(messages: List[str]) -> List[Optional[str]]:
+    lang_client = azure_adapters.language_client(AZURE_LANGUAGE_ENDPOINT, AZURE_LANGUAGE_KEY)
+    SingleLabelClassifyAction = azure_adapters.sdk_attr(
+        "azure.ai.textanalytics", "SingleLabelClassifyAction"
+    )
+    # TODO: ensure the custom classification project + deployment exist in Azure AI Language.
+    poller = lang_client.begin_analyze_actions(
+        messages,
+        actions=[
+            SingleLabelClassifyAction(
+                project_name=AZURE_LANGUAGE_INTENT_PROJECT,
+                deployment_name=AZURE_LANGUAGE_INTENT_DEPLOYMENT,
+            )
+        ],
+    )
+    # One entry per input document, in input order.
+    return [_first_category(doc) for doc in poller.result()]
+
+
+def _key_phrases_batch(messages: List[str]) -> List[List[str]]:
+    lang_client = azure_adapters.language_client(AZURE_LANGUAGE_ENDPOINT, AZURE_LANGUAGE_KEY)
+    return [
+        [] if doc.is_error else list(doc.key_phrases)
+        for doc in lang_client.extract_key_phrases(messages)
+    ]
+
+
+async def _classify_remote(messages: List[str]) -> List[Optional[str]]:
+    return await get_breaker("language").call(asyncio.to_thread, _classify_batch, messages)
+
+
+async def _key_phrases_remote(messages: List[str]) -> List[List[str]]:
+    return await get_breaker("language").call(asyncio.to_thread, _key_phrases_batch, messages)
+
+
+# Concurrent chats share one Language Service request. Batch sizes follow the
+# service's per-request document limits.
+_intent_batcher = MicroBatcher(
+    _classify_remote, max_batch_size=25, max_wait_ms=LANGUAGE_BATCH_WAIT_MS
+)
+_key_phrase_batcher = MicroBatcher(
+    _key_phrases_remote, max_batch_size=10, max_wait_ms=LANGUAGE_BATCH_WAIT_MS
+)
+
+
 async def detect_intent(message: str) -> str:
     """
     Try Azure Language Service single-label classification.
@@ -163,43 +474,18 @@ async def detect_intent(message: str) -> str:
     """
     if AZURE_LANGUAGE_ENDPOINT and AZURE_LANGUAGE_KEY:
         try:
-            credential = AzureKeyCredential(AZURE_LANGUAGE_KEY)
-            lang_client = TextAnalyticsClient(
-                endpoint=AZURE_LANGUAGE_ENDPOINT, credential=credential
-            )
-
             if AZURE_LANGUAGE_INTENT_PROJECT and AZURE_LANGUAGE_INTENT_DEPLOYMENT:
-                # TODO: ensure the custom classification project + deployment exist in Azure AI Language.
-                poller = await asyncio.to_thread(
-                    lang_client.begin_analyze_actions,
-                    [message],
-                    actions=[
-                        SingleLabelClassifyAction(
-                            project_name=AZURE_LANGUAGE_INTENT_PROJECT,
-                            deployment_name=AZURE_LANGUAGE_INTENT_DEPLOYMENT,
-                        )
-                    ],
-                )
-                results = await asyncio.to_thread(lambda: list(poller.result()))
-                for doc in results:
-                    for action_result in doc:
-                        if getattr(action_result, "is_error", False):
-                            continue
-                        for doc_result in getattr(action_result, "documents_results", []):
-                            classification = getattr(doc_result, "classification", None)
-                            if classification and getattr(classification, "category", None):
-                                return classification.category
+                category = await _intent_batcher.submit(message)
+                if category:
+                    return category
             else:
                 # Use key phrases as a light-weight Language Service signal.
-                phrase_result = lang_client.extract_key_phrases([message])
-                phrases: List[str] = []
-                for doc in phrase_result:
-                    if not doc.is_error:
-                        phrases.extend(doc.key_phrases)
+                phrases = await _key_phrase_batcher.submit(message)
                 inferred = _heuristic_intent(message, phrases)
                 return inferred
         except Exception:
-            # Silent fallback to heuristics if Language Service is unavailable.
+            # Silent fallback to heuristics if Language Service is unavailable
+            # or its circuit is open.
             pass
 
     return _heuristic_intent(message, [])
@@ -264,7 +550,7 @@ Write a concise, neutral explanation covering:
 - How those proposals might affect everyday people
 Avoid advocacy; use clear, plain language.
 """
-    return _run_completion(
+    return await _run_completion(
         [
             {"role": "system", "content": BASE_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt},
@@ -273,6 +559,19 @@ Avoid advocacy; use clear, plain language.
     )
 
 
+def _extractive_policy_answer(message: str, snippets: List[Tuple[str, str]]) -> str:
+    # Without retrieved material there is nothing to extract from; don't echo
+    # the question back as an answer.
+    sources = [(title, text) for title, text in snippets if text and text != message]
+    summary = extractive.summarize(sources, query=message) if sources else ""
+    if summary:
+        return summary
+    return extractive.ExtractiveAnswer(
+        "I can’t generate a detailed answer right now. Please try again in a moment, "
+        "or check official sources such as your local government’s website."
+    )
+
+
 async def summarize_policy_openai(message: str, snippets: List[Tuple[str, str]]) -> str:
     formatted_snippets = "\n\n".join(
         [f"Source {idx+1} - {title}:\n{snippet}" for idx, (title, snippet) in enumerate(snippets)]
@@ -285,12 +584,13 @@ Relevant material:
 
 Write a neutral, plain-language explanation of the policy and likely impact. Mention any uncertainty if sources conflict.
 """
-    return _run_completion(
+    return await _run_completion(
         [
             {"role": "system", "content": BASE_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt},
         ],
         max_tokens=500,
+        degraded_answer=lambda: _extractive_policy_answer(message, snippets),
     )
 
 
@@ -301,7 +601,7 @@ User message: {message}
 
 Suggest 3–5 constructive, neutral actions. Keep each action to one short sentence and avoid political persuasion.
 """
-    return _run_completion(
+    return await _run_completion(
         [
             {"role": "system", "content": BASE_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt},
@@ -310,34 +610,142 @@ Suggest 3–5 constructive, neutral actions. Keep each action to one short sente
     )
 
 
+# filename -> (content hash, extracted text). Keyed by content rather than
+# mtime so an entry restored from a warm snapshot still matches the same file
+# deployed on another host.
+_pamphlet_cache: Dict[str, Tuple[str, str]] = {}
+# path -> (mtime, size, content hash), so unchanged files aren't re-hashed.
+_pamphlet_digests: Dict[str, Tuple[float, int, str]] = {}
+
+
+def export_pamphlet_cache() -> Dict[str, List]:
+    return {name: [digest, text] for name, (digest, text) in _pamphlet_cache.items()}
+
+
+def import_pamphlet_cache(entries: Dict[str, List]) -> None:
+    for name, (digest, text) in entries.items():
+        _pamphlet_cache.setdefault(name, (str(digest), text))
+
+
+def _file_digest(path: str) -> str:
+    stat = os.stat(path)
+    known = _pamphlet_digests.get(path)
+    if known and known[0] == stat.st_mtime and known[1] == stat.st_size:
+        return known[2]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    _pamphlet_digests[path] = (stat.st_mtime, stat.st_size, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def _analyze_with_docintel(client: Any, path: str, pages: Optional[str] = None) -> Any:
+    with open(path, "rb") as f:
+        kwargs = {"pages": pages} if pages else {}
+        poller = client.begin_analyze_document("prebuilt-read", f, **kwargs)
+        return poller.result()
+
+
+async def _ocr_pages(
+    client: Any, breaker: Any, path: str, page_numbers: List[int]
+) -> Dict[int, str]:
+    """OCR only the given (1-based) pages of a PDF; empty if OCR is unavailable."""
+    if client is None or not page_numbers:
+        return {}
+    try:
+        result = await breaker.call(
+            asyncio.to_thread,
+            _analyze_with_docintel,
+            client,
+            path,
+            ",".join(str(n) for n in page_numbers),
+        )
+    except Exception:
+        return {}
+    return {
+        page.page_number: "\n".join(line.content for line in (page.lines or []))
+        for page in (getattr(result, "pages", None) or [])
+    }
+
+
+async def _extract_pamphlet(
+    filename: str, path: str, client: Any, breaker: Any
+) -> Tuple[Optional[str], bool]:
+    """
+    Returns (text, complete). `complete` is False when an image-only page
+    couldn't be OCR'd (service down or circuit open), so the partial text
+    is served but not cached.
+    """
+    pages = None
+    if filename.lower().endswith(".pdf") and pdf_text.text_layer_available():
+        try:
+            pages = await pdf_text.extract_text_layer(path, PAMPHLET_EXCERPT_CHARS)
+        except Exception:
+            # Encrypted or malformed PDFs go to OCR whole.
+            pages = None
+
+    if pages is not None:
+        # Only image-only pages within the excerpt are worth paying OCR for.
+        needs_ocr = [n for n, text in pages if text is None]
+        ocr_text = await _ocr_pages(client, breaker, path, needs_ocr)
+        content = "\n".join(
+            text if text is not None else ocr_text.get(n, "") for n, text in pages
+        ).strip()
+        # Without OCR configured, retrying can't recover those pages.
+        complete = client is None or all(n in ocr_text for n in needs_ocr)
+    elif client is not None:
+        result = await breaker.call(asyncio.to_thread, _analyze_with_docintel, client, path)
+        content = result.content if hasattr(result, "content") else ""
+        complete = True
+    else:
+        return None, False
+    return content[:PAMPHLET_EXCERPT_CHARS] or None, complete
+
+
 async def extract_pamphlet_texts() -> List[Tuple[str, str]]:
     """
-    Try to read candidate pamphlet PDFs with Azure Document Intelligence.
-    Falls back to a placeholder snippet if the service or files are not ready.
+    Read candidate pamphlets, taking text straight from a PDF's embedded text
+    layer and using Azure Document Intelligence only for image-only pages and
+    image files. Falls back to a placeholder snippet if nothing can be read.
     """
     documents: List[Tuple[str, str]] = []
     docintel_ready = AZURE_DOCINTEL_ENDPOINT and AZURE_DOCINTEL_KEY
-    if docintel_ready and os.path.isdir(DOCINTEL_PAMPHLET_DIR):
-        credential = AzureKeyCredential(AZURE_DOCINTEL_KEY)
-        client = DocumentAnalysisClient(
-            endpoint=AZURE_DOCINTEL_ENDPOINT, credential=credential
+    local_ready = pdf_text.text_layer_available()
+    if (docintel_ready or local_ready) and os.path.isdir(DOCINTEL_PAMPHLET_DIR):
+        client = (
+            azure_adapters.document_analysis_client(AZURE_DOCINTEL_ENDPOINT, AZURE_DOCINTEL_KEY)
+            if docintel_ready
+            else None
         )
-        for filename in os.listdir(DOCINTEL_PAMPHLET_DIR):
-            if not filename.lower().endswith((".pdf", ".png", ".jpg", ".jpeg")):
-                continue
+        # OCR of a multi-page PDF is much slower than the other services.
+        breaker = get_breaker("document_intelligence", call_timeout=30.0)
+
+        async def _read(filename: str) -> Optional[Tuple[str, str]]:
             path = os.path.join(DOCINTEL_PAMPHLET_DIR, filename)
+            digest = await asyncio.to_thread(_file_digest, path)
+            cached = _pamphlet_cache.get(filename)
+            if cached and cached[0] == digest:
+                return filename, cached[1]
             try:
-                with open(path, "rb") as f:
-                    poller = await asyncio.to_thread(
-                        client.begin_analyze_document, "prebuilt-read", f
-                    )
-                    result = await asyncio.to_thread(poller.result)
-                    content = result.content if hasattr(result, "content") else ""
-                    if content:
-                        documents.append((filename, content[:2000]))
+                content, complete = await _extract_pamphlet(filename, path, client, breaker)
             except Exception:
-                # Continue to the next file if parsing fails.
-                continue
+                # Skip this file if parsing fails or OCR is degraded.
+                return None
+            if not content:
+                return None
+            if complete:
+                _pamphlet_cache[filename] = (digest, content)
+            return filename, content
+
+        filenames = sorted(
+            name
+            for name in os.listdir(DOCINTEL_PAMPHLET_DIR)
+            if name.lower().endswith((".pdf", ".png", ".jpg", ".jpeg"))
+        )
+        for item in await asyncio.gather(*(_read(name) for name in filenames)):
+            if item:
+                documents.append(item)
 
     if not documents:
         placeholder = (
@@ -361,11 +769,14 @@ async def search_policy_index(query: str, top_k: int = 3) -> List[Dict[str, str]
     if not (AZURE_SEARCH_ENDPOINT and AZURE_SEARCH_KEY and AZURE_SEARCH_POLICY_INDEX):
         return []
 
-    credential = AzureKeyCredential(AZURE_SEARCH_KEY)
-    client = SearchClient(
-        endpoint=AZURE_SEARCH_ENDPOINT,
-        index_name=AZURE_SEARCH_POLICY_INDEX,
-        credential=credential,
+    cache = retrieval_cache.get_cache()
+    cached = cache.get(query, top_k)
+    if cached is not None:
+        return cached
+    index_version = cache.index_version
+
+    client = azure_adapters.search_client(
+        AZURE_SEARCH_ENDPOINT, AZURE_SEARCH_KEY, AZURE_SEARCH_POLICY_INDEX
     )
     results: List[Dict[str, str]] = []
     try:
@@ -373,6 +784,9 @@ async def search_policy_index(query: str, top_k: int = 3) -> List[Dict[str, str]
             semantic_config = os.getenv("AZURE_SEARCH_POLICY_SEMANTIC_CONFIG")
             kwargs = {"search_text": query, "top": top_k}
             if semantic_config:
+                QueryType = azure_adapters.sdk_attr(
+                    "azure.search.documents.models", "QueryType"
+                )
                 kwargs.update(
                     {
                         "query_type": QueryType.SEMANTIC,
@@ -382,7 +796,7 @@ async def search_policy_index(query: str, top_k: int = 3) -> List[Dict[str, str]
                 )
             return list(client.search(**kwargs))
 
-        search_results = await asyncio.to_thread(_search)
+        search_results = await get_breaker("search").call(asyncio.to_thread, _search)
         for item in search_results:
             captions = []
             item_dict = dict(item)
@@ -401,9 +815,28 @@ async def search_policy_index(query: str, top_k: int = 3) -> List[Dict[str, str]
     except Exception:
         return []
 
+    cache.put(query, top_k, results, version=index_version)
     return results
 
 
+async def search_index_version() -> Optional[int]:
+    """
+    Document count of the policy index, polled to invalidate the retrieval
+    cache after ingestion adds or removes documents. Deliberately outside the
+    "search" breaker: a failing poll says nothing about query traffic.
+    """
+    key = AZURE_SEARCH_ADMIN_KEY or AZURE_SEARCH_KEY
+    if not (AZURE_SEARCH_ENDPOINT and key and AZURE_SEARCH_POLICY_INDEX):
+        return None
+    client = azure_adapters.search_client(
+        AZURE_SEARCH_ENDPOINT, key, AZURE_SEARCH_POLICY_INDEX
+    )
+    return await asyncio.wait_for(
+        asyncio.to_thread(client.get_document_count),
+        timeout=SEARCH_INDEX_POLL_TIMEOUT_SECONDS,
+    )
+
+
 async def run_content_safety_check(answer: str) -> Tuple[bool, str, Optional[str]]:
     """
     Returns (is_blocked, safe_text, reason)
@@ -411,12 +844,13 @@ async def run_content_safety_check(answer: str) -> Tuple[bool, str, Optional[str
     if not (AZURE_CONTENT_SAFETY_ENDPOINT and AZURE_CONTENT_SAFETY_KEY):
         return False, answer, None
 
-    credential = AzureKeyCredential(AZURE_CONTENT_SAFETY_KEY)
-    client = ContentSafetyClient(
-        endpoint=AZURE_CONTENT_SAFETY_ENDPOINT, credential=credential
-    )
-
     try:
+        client = azure_adapters.content_safety_client(
+            AZURE_CONTENT_SAFETY_ENDPOINT, AZURE_CONTENT_SAFETY_KEY
+        )
+        safety_models = azure_adapters.lazy_import("azure.ai.contentsafety.models")
+        AnalyzeTextOptions = safety_models.AnalyzeTextOptions
+        TextCategory = safety_models.TextCategory
         request = AnalyzeTextOptions(
             text=answer,
             categories=[
@@ -426,7 +860,9 @@ async def run_content_safety_check(answer: str) -> Tuple[bool, str, Optional[str
                 TextCategory.VIOLENCE,
             ],
         )
-        response = await asyncio.to_thread(client.analyze_text, request)
+        response = await get_breaker("content_safety").call(
+            asyncio.to_thread, client.analyze_text, request
+        )
         max_severity = max(
             (c.severity for c in response.categories_analysis), default=0
         )
@@ -435,6 +871,9 @@ async def run_content_safety_check(answer: str) -> Tuple[bool, str, Optional[str
                 "I can’t share that answer because it may violate our safety policies. "
                 "Please rephrase your question."
             ), "content_safety_blocked"
+    except deadlines.DeadlineExceeded:
+        # Never let a late request skip the check; the caller gives up instead.
+        raise
     except Exception:
         # If content safety fails, allow the answer to continue rather than blocking silently.
         return False, answer, None
@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import threading
+from types import MappingProxyType
+from typing import Any, Iterable, List, Mapping, Optional, Tuple
+
+# Policies and stories are served from an immutable, versioned snapshot.
+# Reloads build a complete new snapshot off to the side and swap the module
+# reference in one assignment, so readers never lock and never see a
+# half-updated story. Generated content is not stored here: it lives in the
+# shared cache keyed by each record's fingerprint.
+CATALOG_PATH = os.getenv("CATALOG_PATH")
+CATALOG_DATABASE_URL = os.getenv("CATALOG_DATABASE_URL")
+CATALOG_RELOAD_SECONDS = float(os.getenv("CATALOG_RELOAD_SECONDS", 60))
+
+
+def _fingerprint(*parts: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()[:16]
+
+
+def _intern_tags(tags: Iterable[str]) -> Tuple[str, ...]:
+    # The same handful of tags repeat across every record.
+    return tuple(sys.intern(str(tag)) for tag in tags)
+
+
+class PolicyRecord:
+    __slots__ = ("id", "title", "text", "tags", "fingerprint")
+
+    def __init__(self, id: str, title: str, text: str, tags: Iterable[str]):
+        self.id = id
+        self.title = title
+        self.text = text
+        self.tags = _intern_tags(tags)
+        self.fingerprint = _fingerprint(id, title, text, self.tags)
+
+
+class StoryRecord:
+    __slots__ = (
+        "id",
+        "title",
+        "summary",
+        "policy_id",
+        "tags",
+        "image_url",
+        "fingerprint",
+        "_payload",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        title: str,
+        summary: str,
+        policy_id: str,
+        tags: Iterable[str],
+        image_url: Optional[str] = None,
+        policy_fingerprint: str = "",
+    ):
+        self.id = id
+        self.title = title
+        self.summary = summary
+        self.policy_id = policy_id
+        self.tags = _intern_tags(tags)
+        self.image_url = image_url
+        # Changes when the story or its policy changes, which is exactly when
+        # a generated detail for it goes stale.
+        self.fingerprint = _fingerprint(id, title, summary, policy_id, policy_fingerprint)
+        self._payload = MappingProxyType(
+            {
+                "id": id,
+                "title": title,
+                "summary": summary,
+                "policy_id": policy_id,
+                "tags": list(self.tags),
+                "image_url": image_url,
+            }
+        )
+
+    def as_dict(self) -> Mapping[str, Any]:
+        """Read-only Story payload, built once per snapshot."""
+        return self._payload
+
+
+class CatalogSnapshot:
+    __slots__ = ("version", "stories", "stories_by_id", "policies", "feed_json")
+
+    def __init__(self, policies: Iterable[PolicyRecord], stories: Iterable[StoryRecord]):
+        self.policies: Mapping[str, PolicyRecord] = MappingProxyType({p.id: p for p in policies})
+        self.stories: Tuple[StoryRecord, ...] = tuple(stories)
+        self.stories_by_id: Mapping[str, StoryRecord] = MappingProxyType(
+            {s.id: s for s in self.stories}
+        )
+        self.version = _fingerprint(
+            sorted(p.fingerprint for p in self.policies.values()),
+            [s.fingerprint + (s.image_url or "") + ",".join(s.tags) for s in self.stories],
+        )
+        # The /stories response, serialized once instead of on every request.
+        self.feed_json = json.dumps(
+            [dict(s.as_dict()) for s in self.stories], ensure_ascii=False
+        ).encode("utf-8")
+
+
+def build_snapshot(policies: Mapping[str, Mapping[str, Any]], stories: List[Mapping[str, Any]]) -> CatalogSnapshot:
+    """Build a snapshot from the plain dict shapes used by DUMMY_POLICIES/DUMMY_STORIES."""
+    policy_records = [
+        PolicyRecord(policy_id, p["title"], p["text"], p.get("tags", []))
+        for policy_id, p in policies.items()
+    ]
+    by_id = {p.id: p for p in policy_records}
+    story_records = [
+        StoryRecord(
+            s["id"],
+            s["title"],
+            s["summary"],
+            s["policy_id"],
+            s.get("tags", []),
+            s.get("image_url"),
+            policy_fingerprint=by_id[s["policy_id"]].fingerprint if s["policy_id"] in by_id else "",
+        )
+        for s in stories
+    ]
+    return CatalogSnapshot(policy_records, story_records)
+
+
+def load_from_file(path: str) -> CatalogSnapshot:
+    """JSON file shaped like {"policies": {id: {...}}, "stories": [{...}]}."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return build_snapshot(data.get("policies", {}), data.get("stories", []))
+
+
+_engine = None
+
+
+def load_from_database(url: str) -> CatalogSnapshot:
+    """
+    Reads catalog_policies(id, title, text, tags) and
+    catalog_stories(id, title, summary, policy_id, tags, image_url, position);
+    tags are comma-separated.
+    """
+    global _engine
+    from sqlalchemy import create_engine, text
+
+    if _engine is None:
+        _engine = create_engine(url, pool_pre_ping=True)
+
+    def _tags(raw: Optional[str]) -> List[str]:
+        return [t.strip() for t in (raw or "").split(",") if t.strip()]
+
+    with _engine.connect() as conn:
+        policies = {
+            row.id: {"title": row.title, "text": row.text, "tags": _tags(row.tags)}
+            for row in conn.execute(text("SELECT id, title, text, tags FROM catalog_policies"))
+        }
+        stories = [
+            {
+                "id": row.id,
+                "title": row.title,
+                "summary": row.summary,
+                "policy_id": row.policy_id,
+                "tags": _tags(row.tags),
+                "image_url": row.image_url,
+            }
+            for row in conn.execute(
+                text(
+                    "SELECT id, title, summary, policy_id, tags, image_url "
+                    "FROM catalog_stories ORDER BY position"
+                )
+            )
+        ]
+    return build_snapshot(policies, stories)
+
+
+_current: Optional[CatalogSnapshot] = None
+_install_lock = threading.Lock()
+
+
+def current() -> CatalogSnapshot:
+    """The live snapshot. Take it once per request for a consistent view."""
+    snapshot = _current
+    if snapshot is None:
+        raise RuntimeError("No catalog snapshot has been installed.")
+    return snapshot
+
+
+def install(snapshot: CatalogSnapshot) -> bool:
+    """Swap in `snapshot`; returns False if it matches the live version."""
+    global _current
+    with _install_lock:
+        if _current is not None and _current.version == snapshot.version:
+            return False
+        _current = snapshot
+        return True
+
+
+def _load_configured() -> Optional[CatalogSnapshot]:
+    if CATALOG_DATABASE_URL:
+        return load_from_database(CATALOG_DATABASE_URL)
+    if CATALOG_PATH and os.path.isfile(CATALOG_PATH):
+        return load_from_file(CATALOG_PATH)
+    return None
+
+
+def reload() -> bool:
+    """Load from the configured source and swap if it changed."""
+    snapshot = _load_configured()
+    return install(snapshot) if snapshot is not None else False
+
+
+async def run_reloader(interval: float = CATALOG_RELOAD_SECONDS) -> None:
+    last_mtime: Optional[float] = None
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if not CATALOG_DATABASE_URL and CATALOG_PATH:
+                # Skip rebuilding from an unchanged file.
+                mtime = os.path.getmtime(CATALOG_PATH)
+                if mtime == last_mtime:
+                    continue
+                last_mtime = mtime
+            await asyncio.to_thread(reload)
+        except Exception:
+            # Keep serving the last good snapshot; try again next interval.
+            continue
+
+
+_reloader_task: Optional["asyncio.Task[None]"] = None
+
+
+def start_reloader() -> None:
+    global _reloader_task
+    if _reloader_task is None and (CATALOG_DATABASE_URL or CATALOG_PATH) and CATALOG_RELOAD_SECONDS > 0:
+        _reloader_task = asyncio.create_task(run_reloader())
+
+
+def stop_reloader() -> None:
+    global _reloader_task
+    if _reloader_task is not None:
+        _reloader_task.cancel()
+        _reloader_task = None
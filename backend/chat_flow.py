@@ -3,6 +3,9 @@ from typing import List
 
 from models import Source
 import azure_client
+import deadlines
+import token_usage
+from extractive import is_degraded
 
 
 @dataclass
@@ -18,7 +21,7 @@ async def handle_candidate_explanation(message: str) -> ChatResult:
     combined_text = "\n\n".join([text for _, text in pamphlets])
     summary = await azure_client.summarize_candidate_openai(message, combined_text)
     sources = [Source(title=title, snippet=text[:220]) for title, text in pamphlets]
-    tools = ["openai"]
+    tools = ["extractive_summary"] if is_degraded(summary) else ["openai"]
     if pamphlets:
         tools.insert(0, "document_intelligence")
     return ChatResult(
@@ -43,7 +46,8 @@ async def handle_policy_explanation(message: str) -> ChatResult:
     if not snippet_pairs:
         snippet_pairs = [("User question", message)]
     summary = await azure_client.summarize_policy_openai(message, snippet_pairs)
-    tools = ["openai"]
+    # Flag answers served by the local extractive tier instead of the LLM.
+    tools = ["extractive_summary"] if is_degraded(summary) else ["openai"]
     if search_hits:
         tools.insert(0, "search")
     return ChatResult(
@@ -56,7 +60,8 @@ async def handle_policy_explanation(message: str) -> ChatResult:
 
 async def handle_action(message: str) -> ChatResult:
     summary = await azure_client.summarize_actions_openai(message)
-    return ChatResult(intent="action", answer=summary, tools_used=["openai"])
+    tools = ["extractive_summary"] if is_degraded(summary) else ["openai"]
+    return ChatResult(intent="action", answer=summary, tools_used=tools)
 
 
 async def handle_other(message: str) -> ChatResult:
@@ -68,7 +73,11 @@ async def handle_other(message: str) -> ChatResult:
 
 
 async def run_chat(message: str) -> ChatResult:
+    # Stop between stages once the request deadline has passed rather than
+    # paying for the next remote call.
     intent = await azure_client.detect_intent(message)
+    token_usage.set_intent(intent)
+    deadlines.check()
     if intent == "candidate_explanation":
         result = await handle_candidate_explanation(message)
     elif intent == "policy_explanation":
@@ -78,6 +87,7 @@ async def run_chat(message: str) -> ChatResult:
     else:
         result = await handle_other(message)
 
+    deadlines.check()
     blocked, safe_answer, reason = await azure_client.run_content_safety_check(
         result.answer
     )
@@ -0,0 +1,219 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+import deadlines
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# Defaults apply to every dependency; override per dependency with e.g.
+# CIRCUIT_SEARCH_CALL_TIMEOUT_SECONDS or CIRCUIT_LANGUAGE_RESET_SECONDS.
+CIRCUIT_CALL_TIMEOUT_SECONDS = _env_float("CIRCUIT_CALL_TIMEOUT_SECONDS", 5.0)
+CIRCUIT_ERROR_RATE = _env_float("CIRCUIT_ERROR_RATE", 0.5)
+CIRCUIT_MIN_CALLS = _env_float("CIRCUIT_MIN_CALLS", 5)
+CIRCUIT_WINDOW_SECONDS = _env_float("CIRCUIT_WINDOW_SECONDS", 60.0)
+CIRCUIT_RESET_SECONDS = _env_float("CIRCUIT_RESET_SECONDS", 30.0)
+# A call cut short by the request deadline still counts as a failure once it
+# has been waiting this long (or the full call timeout, if shorter); a
+# dependency that can't answer inside a request's budget is unhealthy even
+# if it might eventually answer.
+CIRCUIT_SLOW_CALL_SECONDS = _env_float("CIRCUIT_SLOW_CALL_SECONDS", 10.0)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker over a rolling window of call outcomes.
+
+    While closed, calls go through and their outcomes are recorded. Once the
+    error rate over the window reaches the threshold, the breaker opens and
+    calls fail fast with CircuitOpenError. After reset_timeout a single probe
+    is let through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        call_timeout: float = CIRCUIT_CALL_TIMEOUT_SECONDS,
+        error_rate: float = CIRCUIT_ERROR_RATE,
+        min_calls: int = int(CIRCUIT_MIN_CALLS),
+        window_seconds: float = CIRCUIT_WINDOW_SECONDS,
+        reset_timeout: float = CIRCUIT_RESET_SECONDS,
+        slow_call_seconds: float = CIRCUIT_SLOW_CALL_SECONDS,
+    ):
+        self.name = name
+        self.call_timeout = call_timeout
+        self.slow_call_seconds = min(slow_call_seconds, call_timeout)
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            return self._state
+
+    def _maybe_half_open(self, now: float) -> None:
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._probe_in_flight = False
+                self._outcomes.clear()
+            self._outcomes.append((now, True))
+            self._trim(now)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self._state == HALF_OPEN:
+                self._open(now)
+                return
+            self._outcomes.append((now, False))
+            self._trim(now)
+            total = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if total >= self.min_calls and failures / total >= self.error_rate:
+                self._open(now)
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._probe_in_flight = False
+        self._outcomes.clear()
+
+    async def call(
+        self, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+    ) -> Any:
+        """
+        Await func(*args, **kwargs) under the breaker's timeout, shortened to
+        the request deadline when one is set. Raises CircuitOpenError without
+        calling func when the circuit is open.
+
+        A timeout stops the wait, not the work: a coroutine is cancelled, but
+        a sync SDK call wrapped in asyncio.to_thread runs on to completion.
+        """
+        deadlines.check()
+        if not self.allow_request():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        timeout = deadlines.clamp_timeout(self.call_timeout)
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(func(*args, **kwargs), timeout)
+        except asyncio.TimeoutError:
+            if timeout < self.call_timeout:
+                # The request ran out of time. Only count it against the
+                # dependency if it had a fair chance to answer.
+                if time.monotonic() - started >= self.slow_call_seconds:
+                    self.record_failure()
+                else:
+                    with self._lock:
+                        self._probe_in_flight = False
+                raise deadlines.DeadlineExceeded()
+            self.record_failure()
+            raise
+        except asyncio.CancelledError:
+            # The caller went away; don't count it against the dependency.
+            with self._lock:
+                self._probe_in_flight = False
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self._maybe_half_open(now)
+            self._trim(now)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                "state": self._state,
+                "calls_in_window": len(self._outcomes),
+                "failures_in_window": failures,
+                "call_timeout": self.call_timeout,
+                "slow_call_seconds": self.slow_call_seconds,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str, call_timeout: Optional[float] = None) -> CircuitBreaker:
+    """
+    Return the process-wide breaker for a dependency, creating it on first use.
+    call_timeout replaces the global default timeout for slow dependencies;
+    environment overrides still win.
+    """
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            prefix = f"CIRCUIT_{name.upper()}_"
+            breaker = CircuitBreaker(
+                name,
+                call_timeout=_env_float(
+                    prefix + "CALL_TIMEOUT_SECONDS",
+                    call_timeout if call_timeout is not None else CIRCUIT_CALL_TIMEOUT_SECONDS,
+                ),
+                error_rate=_env_float(prefix + "ERROR_RATE", CIRCUIT_ERROR_RATE),
+                min_calls=int(_env_float(prefix + "MIN_CALLS", CIRCUIT_MIN_CALLS)),
+                window_seconds=_env_float(prefix + "WINDOW_SECONDS", CIRCUIT_WINDOW_SECONDS),
+                reset_timeout=_env_float(prefix + "RESET_SECONDS", CIRCUIT_RESET_SECONDS),
+                slow_call_seconds=_env_float(
+                    prefix + "SLOW_CALL_SECONDS", CIRCUIT_SLOW_CALL_SECONDS
+                ),
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.snapshot() for b in breakers}
@@ -0,0 +1,87 @@
+import asyncio
+import contextvars
+import os
+import time
+from typing import Any, Awaitable, Mapping, Optional
+
+# Clients send their remaining time budget in milliseconds.
+REQUEST_DEADLINE_HEADER = "x-request-deadline-ms"
+DEFAULT_REQUEST_DEADLINE_SECONDS = float(os.getenv("DEFAULT_REQUEST_DEADLINE_SECONDS", 30))
+MAX_REQUEST_DEADLINE_SECONDS = float(os.getenv("MAX_REQUEST_DEADLINE_SECONDS", 60))
+DISCONNECT_POLL_SECONDS = float(os.getenv("DISCONNECT_POLL_SECONDS", 0.25))
+
+# Absolute time.monotonic() deadline for the work running in this context.
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "request_deadline", default=None
+)
+
+
+class DeadlineExceeded(Exception):
+    """The request ran out of time before this step could run."""
+
+
+class ClientDisconnected(Exception):
+    """The client closed the connection; nobody is waiting for the result."""
+
+
+def set_deadline(seconds: Optional[float]) -> None:
+    _deadline.set(time.monotonic() + seconds if seconds is not None else None)
+
+
+def clear_deadline() -> None:
+    """Detach work that should outlive the request, e.g. shared-cache fills."""
+    _deadline.set(None)
+
+
+def remaining() -> Optional[float]:
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check() -> None:
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded()
+
+
+def clamp_timeout(timeout: float) -> float:
+    """Shrink a per-call timeout so it never outlives the request deadline."""
+    left = remaining()
+    if left is None:
+        return timeout
+    return max(0.0, min(timeout, left))
+
+
+def seconds_from_headers(headers: Mapping[str, str]) -> float:
+    raw = headers.get(REQUEST_DEADLINE_HEADER)
+    try:
+        seconds = float(raw) / 1000 if raw else DEFAULT_REQUEST_DEADLINE_SECONDS
+    except ValueError:
+        seconds = DEFAULT_REQUEST_DEADLINE_SECONDS
+    return max(0.0, min(seconds, MAX_REQUEST_DEADLINE_SECONDS))
+
+
+async def run_cancellable(request: Any, work: Awaitable[Any]) -> Any:
+    """
+    Run `work` under the deadline from the request headers, cancelling it as
+    soon as the client disconnects or the deadline passes.
+    """
+    set_deadline(seconds_from_headers(request.headers))
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            left = remaining()
+            wait_for = DISCONNECT_POLL_SECONDS if left is None else min(DISCONNECT_POLL_SECONDS, max(left, 0))
+            done, _ = await asyncio.wait({task}, timeout=wait_for)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise ClientDisconnected()
+            left = remaining()
+            if left is not None and left <= 0:
+                raise DeadlineExceeded()
+    finally:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,93 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Local extractive summarizer used when Azure OpenAI is unconfigured, failing
+# or over capacity. It picks the most central sentences from the source text,
+# so it never adds claims of its own and stays as neutral as the sources.
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])|\n{2,}")
+_WORD = re.compile(r"[a-z0-9']+")
+_STOP_WORDS = frozenset(
+    """
+    a about above after again against all also am an and any are as at be because been
+    before being below between both but by can could did do does doing down during each
+    few for from further had has have having he her here hers herself him himself his how
+    i if in into is it its itself just may me might more most must my myself no nor not
+    now of off on once only or other our ours ourselves out over own same she should so
+    some such than that the their theirs them themselves then there these they this those
+    through to too under until up very was we were what when where which while who whom
+    why will with would you your yours yourself yourselves
+    """.split()
+)
+
+
+class ExtractiveAnswer(str):
+    """Text produced by the extractive tier instead of the LLM."""
+
+
+def is_degraded(text: object) -> bool:
+    return isinstance(text, ExtractiveAnswer)
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_END.split(text or "") if s and len(s.strip()) > 20]
+
+
+def _terms(text: str) -> List[str]:
+    return [w for w in _WORD.findall(text.lower()) if w not in _STOP_WORDS and len(w) > 2]
+
+
+def summarize(
+    sources: Sequence[Tuple[str, str]],
+    query: Optional[str] = None,
+    max_sentences: int = 4,
+    cite_sources: bool = True,
+) -> ExtractiveAnswer:
+    """
+    Pick the max_sentences most representative sentences from (title, text)
+    sources. Each sentence is scored by the document-frequency-weighted
+    weight of its terms, boosted by overlap with `query` and by position,
+    then the winners are returned in their original order.
+    """
+    sentences: List[Tuple[int, int, str, List[str]]] = []
+    for source_index, (_, text) in enumerate(sources):
+        for position, sentence in enumerate(split_sentences(text)):
+            sentences.append((source_index, position, sentence, _terms(sentence)))
+    if not sentences:
+        return ExtractiveAnswer("")
+
+    # Term weights: how many sentences use the term, damped so that very
+    # common words don't dominate.
+    doc_freq: Counter = Counter()
+    for _, _, _, terms in sentences:
+        doc_freq.update(set(terms))
+    total = len(sentences)
+    weights: Dict[str, float] = {
+        term: freq * math.log(1 + total / freq) for term, freq in doc_freq.items()
+    }
+    query_terms = set(_terms(query or ""))
+
+    scored = []
+    for index, (source_index, position, sentence, terms) in enumerate(sentences):
+        if not terms:
+            continue
+        unique = set(terms)
+        score = sum(weights[t] for t in unique) / math.sqrt(len(terms))
+        if query_terms:
+            score *= 1 + len(unique & query_terms) / len(query_terms)
+        score *= 1 + 0.5 / (1 + position)
+        scored.append((score, index))
+
+    chosen = sorted(index for _, index in sorted(scored, reverse=True)[:max_sentences])
+    summary = " ".join(sentences[i][2] for i in chosen)
+    if cite_sources:
+        used = []
+        for i in chosen:
+            title = sources[sentences[i][0]][0]
+            if title and title not in used:
+                used.append(title)
+        if used:
+            summary += "\n\nSources: " + "; ".join(used)
+    return ExtractiveAnswer(summary)
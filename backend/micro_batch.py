@@ -0,0 +1,82 @@
+import asyncio
+import inspect
+from typing import Any, Callable, Generic, List, Optional, Set, Tuple, TypeVar
+
+import deadlines
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collects items submitted by concurrent coroutines for up to max_wait_ms
+    (or until max_batch_size is reached), runs them through one batched call
+    and hands each caller its own result.
+
+    batch_fn takes a list of items and returns a list of results in the same
+    order. It may be a coroutine function (e.g. a remote Azure endpoint) or a
+    plain function (e.g. a local model), which is run in a worker thread.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[T]], Any],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[T, "asyncio.Future[R]"]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Strong references to running batches so they aren't garbage collected.
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[R]" = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = [(item, fut) for item, fut in self._pending if not fut.cancelled()]
+        self._pending = []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[T, "asyncio.Future[R]"]]) -> None:
+        # The batch serves several requests, so none of their deadlines apply.
+        deadlines.clear_deadline()
+        items = [item for item, _ in batch]
+        try:
+            if inspect.iscoroutinefunction(self.batch_fn):
+                results = await self.batch_fn(items)
+            else:
+                results = await asyncio.to_thread(self.batch_fn, items)
+            if len(results) != len(items):
+                raise ValueError(
+                    f"Batch function returned {len(results)} results for {len(items)} items."
+                )
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        finally:
+            # Only reached with futures pending if the batch itself was
+            # cancelled (e.g. at shutdown); don't leave callers waiting.
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 
 
@@ -16,6 +16,32 @@ class StoryDetail(Story):
     detailed_summary: str
 
 
+# Story details are generated (and cached) only for these levels.
+ReadingLevel = Literal["default", "simple"]
+
+
+class StoryDetailRequestItem(BaseModel):
+    story_id: str
+    reading_level: ReadingLevel = "default"
+
+
+class StoryBatchRequest(BaseModel):
+    items: List[StoryDetailRequestItem]
+
+
+class StoryBatchItem(BaseModel):
+    story_id: str
+    reading_level: str
+    cached: bool = False
+    detail: Optional[StoryDetail] = None
+    error: Optional[str] = None
+
+
+class StoryPrefetchRequest(BaseModel):
+    story_ids: List[str]
+    reading_levels: List[ReadingLevel] = ["default"]
+
+
 class ExplainPolicyRequest(BaseModel):
     policy_id: str
     user_role: Optional[str] = "general"
@@ -36,10 +62,21 @@ class TakeActionRequest(BaseModel):
     user_role: Optional[str] = "general"
 
 
+class ActionResourceOut(BaseModel):
+    id: str
+    name: str
+    kind: str
+    url: Optional[str] = None
+    description: Optional[str] = None
+    distance_km: Optional[float] = None
+    starts_at: Optional[datetime] = None
+
+
 class TakeActionResponse(BaseModel):
     policy_title: str
     actions: List[str]
     disclaimer: str
+    resources: List[ActionResourceOut] = []
 
 
 class ShortVideo(BaseModel):
@@ -0,0 +1,107 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+# Pages with less embedded text than this are treated as scanned images and
+# left for OCR.
+PDF_MIN_CHARS_PER_PAGE = int(os.getenv("PDF_MIN_CHARS_PER_PAGE", 40))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", 4))
+# Assumed text yield of a page that needs OCR, used to decide how far into a
+# document we have to read before the excerpt is full.
+PDF_OCR_PAGE_CHARS_ESTIMATE = int(os.getenv("PDF_OCR_PAGE_CHARS_ESTIMATE", 1000))
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", min(4, os.cpu_count() or 1)))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawn rather than fork: the worker already has threads, SQLite
+            # connections and HTTP clients that a forked child would inherit
+            # mid-use.
+            _executor = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def text_layer_available() -> bool:
+    try:
+        import pypdf  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _page_count(path: str) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(path).pages)
+
+
+def _extract_pages(path: str, first: int, last: int) -> List[Tuple[int, str]]:
+    # Runs in a worker process; each worker opens the file itself so only the
+    # path and the extracted text cross the process boundary.
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    pages: List[Tuple[int, str]] = []
+    for index in range(first, min(last, len(reader.pages))):
+        try:
+            text = reader.pages[index].extract_text() or ""
+        except Exception:
+            text = ""
+        pages.append((index + 1, text.strip()))
+    return pages
+
+
+async def extract_text_layer(
+    path: str, max_chars: int
+) -> List[Tuple[int, Optional[str]]]:
+    """
+    Read the embedded text layer of a PDF page by page across a process pool.
+    Returns (page_number, text) in page order, with text None for pages that
+    need OCR, and stops once max_chars of text is covered so the rest of the
+    document is never read.
+    """
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    page_total = await loop.run_in_executor(executor, _page_count, path)
+    chunks = [
+        loop.run_in_executor(executor, _extract_pages, path, start, start + PDF_PAGES_PER_TASK)
+        for start in range(0, page_total, PDF_PAGES_PER_TASK)
+    ]
+
+    pages: List[Tuple[int, Optional[str]]] = []
+    covered = 0
+    try:
+        # Consume chunks in page order while later chunks are still running.
+        for chunk in chunks:
+            for page_number, text in await chunk:
+                if len(text) >= PDF_MIN_CHARS_PER_PAGE:
+                    pages.append((page_number, text))
+                    covered += len(text)
+                else:
+                    pages.append((page_number, None))
+                    covered += PDF_OCR_PAGE_CHARS_ESTIMATE
+                if covered >= max_chars:
+                    return pages
+    finally:
+        for chunk in chunks:
+            chunk.cancel()
+    return pages
@@ -0,0 +1,178 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# In-process LRU of processed Azure AI Search results, keyed by a normalized
+# query and top_k. Entries are tagged with the index version they were read
+# from; when ingestion changes the index, the version moves and every older
+# entry becomes a miss.
+RETRIEVAL_CACHE_MAX_ENTRIES = int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", 512))
+# Backstop for in-place document edits, which don't change the document count.
+RETRIEVAL_CACHE_TTL_SECONDS = float(os.getenv("RETRIEVAL_CACHE_TTL_SECONDS", 3600))
+RETRIEVAL_CACHE_STEM = os.getenv("RETRIEVAL_CACHE_STEM", "true").lower() in ("1", "true", "yes")
+RETRIEVAL_INDEX_POLL_SECONDS = float(os.getenv("RETRIEVAL_INDEX_POLL_SECONDS", 60))
+
+_WORD = re.compile(r"[a-z0-9']+")
+# Only articles, auxiliaries, pronouns and question words. Negations,
+# prepositions and quantifiers ("not", "before"/"after", "over"/"under",
+# "more"/"few", "against") change what a policy question means, so they stay.
+_QUERY_STOP_WORDS = frozenset(
+    """
+    a an the is are was were be been being am do does did has have had can could
+    will would shall should may might must i me my we us our you your it its
+    they them their this that these those what which who whom how please
+    """.split()
+)
+_SUFFIXES = ("ing", "ies", "ed", "es", "s")
+
+Results = List[Dict[str, str]]
+
+
+def _stem(word: str) -> str:
+    # Deliberately light: only folds plurals and common verb endings, so
+    # "evictions"/"eviction" and "renting"/"rent" share an entry.
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3 and not word.endswith("ss"):
+            stem = word[: -len(suffix)]
+            return stem + "y" if suffix == "ies" else stem
+    return word
+
+
+def normalize_query(query: str, stem: bool = RETRIEVAL_CACHE_STEM) -> str:
+    words = _WORD.findall((query or "").lower())
+    terms = [w for w in words if w not in _QUERY_STOP_WORDS]
+    if not terms:
+        # A query made only of stop words still needs a stable key.
+        return " ".join(words)
+    if stem:
+        terms = [_stem(t) for t in terms]
+    return " ".join(terms)
+
+
+class RetrievalCache:
+    def __init__(
+        self,
+        max_entries: int = RETRIEVAL_CACHE_MAX_ENTRIES,
+        ttl: float = RETRIEVAL_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[Any, float, Results]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Any = 0
+        self.hits = 0
+        self.misses = 0
+        # Outcome of the last index-version poll, for /health.
+        self.last_poll: Dict[str, Any] = {"ok": None}
+
+    @property
+    def index_version(self) -> Any:
+        return self._version
+
+    def set_index_version(self, version: Any) -> bool:
+        """Returns True (and drops every entry) if the version changed."""
+        with self._lock:
+            if version == self._version:
+                return False
+            self._version = version
+            self._entries.clear()
+            return True
+
+    def bump_index_version(self) -> None:
+        """For ingestion code running in this process: invalidate everything."""
+        with self._lock:
+            self._version = (self._version, time.time())
+            self._entries.clear()
+
+    def get(self, query: str, top_k: int) -> Optional[Results]:
+        key = (normalize_query(query), top_k)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != self._version or entry[1] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Copies, so callers can't edit the cached dicts.
+            return [dict(result) for result in entry[2]]
+
+    def put(self, query: str, top_k: int, results: Results, version: Any = None) -> None:
+        """`version` is the index version read before the search started."""
+        with self._lock:
+            version = self._version if version is None else version
+            if version != self._version:
+                # The index changed while this search was in flight.
+                return
+            key = (normalize_query(query), top_k)
+            self._entries[key] = (
+                version,
+                time.monotonic() + self.ttl,
+                [dict(result) for result in results],
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "index_version": str(self._version),
+                "index_poll": dict(self.last_poll),
+            }
+
+
+_cache = RetrievalCache()
+
+
+def get_cache() -> RetrievalCache:
+    return _cache
+
+
+async def poll_index_version(
+    fetch_version: Callable[[], Awaitable[Any]],
+    interval: float = RETRIEVAL_INDEX_POLL_SECONDS,
+) -> None:
+    while True:
+        try:
+            version = await fetch_version()
+            if version is not None:
+                _cache.set_index_version(version)
+                _cache.last_poll = {"ok": True, "checked_at": time.time()}
+        except Exception as exc:
+            # Keep the current version; cached entries still expire by TTL.
+            _cache.last_poll = {
+                "ok": False,
+                "checked_at": time.time(),
+                "error": f"{type(exc).__name__}: {exc}"[:200],
+            }
+        await asyncio.sleep(interval)
+
+
+_poll_task: Optional["asyncio.Task[None]"] = None
+
+
+def start_polling(fetch_version: Callable[[], Awaitable[Any]]) -> None:
+    global _poll_task
+    if _poll_task is None and RETRIEVAL_INDEX_POLL_SECONDS > 0:
+        _poll_task = asyncio.create_task(poll_index_version(fetch_version))
+
+
+def stop_polling() -> None:
+    global _poll_task
+    if _poll_task is not None:
+        _poll_task.cancel()
+        _poll_task = None
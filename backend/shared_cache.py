@@ -0,0 +1,316 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import deadlines
+
+# Network backend, e.g. redis://cache.internal:6379/0. When unset, workers on
+# the same host share a SQLite database in WAL mode.
+SHARED_CACHE_URL = os.getenv("SHARED_CACHE_URL")
+SHARED_CACHE_PATH = os.getenv(
+    "SHARED_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "civiccompanion_cache.sqlite3"),
+)
+SHARED_CACHE_TTL_SECONDS = float(os.getenv("SHARED_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+# How long a worker may hold a single-flight lock before others take over.
+SHARED_CACHE_LOCK_SECONDS = float(os.getenv("SHARED_CACHE_LOCK_SECONDS", 60))
+SHARED_CACHE_POLL_SECONDS = float(os.getenv("SHARED_CACHE_POLL_SECONDS", 0.1))
+# SQLite backend housekeeping: how often writes purge expired rows, and the
+# most rows kept (oldest writes are dropped first).
+SHARED_CACHE_PURGE_SECONDS = float(os.getenv("SHARED_CACHE_PURGE_SECONDS", 60))
+SHARED_CACHE_MAX_ENTRIES = int(os.getenv("SHARED_CACHE_MAX_ENTRIES", 20000))
+
+
+class CacheBackend:
+    """Minimal key/value interface every shared cache backend implements."""
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def acquire_lock(self, key: str, owner: str, ttl: float) -> bool:
+        raise NotImplementedError
+
+    def release_lock(self, key: str, owner: str) -> None:
+        raise NotImplementedError
+
+    def export_entries(self) -> List[Tuple[str, str, Optional[float]]]:
+        """(key, value, expires_at) rows for warm-state snapshots."""
+        # Network backends are already shared by every instance.
+        return []
+
+    def import_entries(self, rows: List[Tuple[str, str, Optional[float]]]) -> None:
+        return None
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache stored in a local SQLite file in WAL mode, so every worker process
+    on the host (and the next process after a restart) sees the same entries.
+    """
+
+    def __init__(self, path: str = SHARED_CACHE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._last_purge = 0.0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS locks "
+            "(key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self.purge()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            return None
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        self._conn().execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, expires_at),
+        )
+        if time.time() - self._last_purge >= SHARED_CACHE_PURGE_SECONDS:
+            self.purge()
+
+    def purge(self) -> None:
+        """Delete expired rows and trim the table to SHARED_CACHE_MAX_ENTRIES."""
+        self._last_purge = time.time()
+        conn = self._conn()
+        conn.execute(
+            "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at < ?",
+            (self._last_purge,),
+        )
+        conn.execute("DELETE FROM locks WHERE expires_at < ?", (self._last_purge,))
+        if SHARED_CACHE_MAX_ENTRIES > 0:
+            # INSERT OR REPLACE assigns a new rowid, so rowid order is write order.
+            conn.execute(
+                "DELETE FROM entries WHERE rowid IN (SELECT rowid FROM entries "
+                "ORDER BY rowid DESC LIMIT -1 OFFSET ?)",
+                (SHARED_CACHE_MAX_ENTRIES,),
+            )
+
+    def acquire_lock(self, key: str, owner: str, ttl: float) -> bool:
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM locks WHERE key = ? AND expires_at < ?", (key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO locks (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, owner, now + ttl),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+
+    def release_lock(self, key: str, owner: str) -> None:
+        self._conn().execute("DELETE FROM locks WHERE key = ? AND owner = ?", (key, owner))
+
+    def export_entries(self) -> List[Tuple[str, str, Optional[float]]]:
+        return self._conn().execute(
+            "SELECT key, value, expires_at FROM entries "
+            "WHERE expires_at IS NULL OR expires_at > ?",
+            (time.time(),),
+        ).fetchall()
+
+    def import_entries(self, rows: List[Tuple[str, str, Optional[float]]]) -> None:
+        # Never overwrite entries this host generated itself.
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO entries (key, value, expires_at) VALUES (?, ?, ?)",
+                [tuple(row) for row in rows],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+class RedisCache(CacheBackend):
+    """Network backend for deployments that span several hosts."""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "SHARED_CACHE_URL points at Redis but the 'redis' package is not installed."
+            ) from exc
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self._client.set(key, value, px=int(ttl * 1000) if ttl else None)
+
+    def acquire_lock(self, key: str, owner: str, ttl: float) -> bool:
+        return bool(self._client.set(f"lock:{key}", owner, nx=True, px=int(ttl * 1000)))
+
+    def release_lock(self, key: str, owner: str) -> None:
+        lock_key = f"lock:{key}"
+        if self._client.get(lock_key) == owner:
+            self._client.delete(lock_key)
+
+
+_backend_factories: Dict[str, Callable[[str], CacheBackend]] = {
+    "redis": RedisCache,
+    "rediss": RedisCache,
+}
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+_inflight: Dict[str, "asyncio.Task[Any]"] = {}
+
+
+def register_backend(scheme: str, factory: Callable[[str], CacheBackend]) -> None:
+    """Plug in a network backend for SHARED_CACHE_URL values using `scheme`."""
+    _backend_factories[scheme] = factory
+
+
+def get_cache() -> CacheBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if SHARED_CACHE_URL:
+                scheme = urlparse(SHARED_CACHE_URL).scheme
+                factory = _backend_factories.get(scheme)
+                if factory is None:
+                    raise RuntimeError(f"No shared cache backend registered for '{scheme}'.")
+                _backend = factory(SHARED_CACHE_URL)
+            else:
+                _backend = SQLiteCache()
+        return _backend
+
+
+def make_key(namespace: str, *parts: Any) -> str:
+    digest = hashlib.sha256(
+        json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()[:32]
+    return f"{namespace}:{digest}"
+
+
+async def load(key: str) -> Any:
+    raw = await asyncio.to_thread(get_cache().get, key)
+    return json.loads(raw) if raw is not None else None
+
+
+async def store(key: str, value: Any, ttl: Optional[float] = SHARED_CACHE_TTL_SECONDS) -> None:
+    await asyncio.to_thread(get_cache().set, key, json.dumps(value), ttl)
+
+
+async def _produce_once(
+    key: str,
+    producer: Callable[[], Awaitable[Any]],
+    ttl: Optional[float],
+    cache_if: Optional[Callable[[Any], bool]] = None,
+) -> Any:
+    backend = get_cache()
+    owner = uuid.uuid4().hex
+    deadline = time.monotonic() + SHARED_CACHE_LOCK_SECONDS
+    while True:
+        cached = await load(key)
+        if cached is not None:
+            return cached
+        locked = await asyncio.to_thread(
+            backend.acquire_lock, key, owner, SHARED_CACHE_LOCK_SECONDS
+        )
+        if locked or time.monotonic() >= deadline:
+            break
+        # Another worker is generating this entry; wait for it to land.
+        await asyncio.sleep(SHARED_CACHE_POLL_SECONDS)
+
+    try:
+        if locked:
+            cached = await load(key)
+            if cached is not None:
+                return cached
+        value = await producer()
+        if value is not None and (cache_if is None or cache_if(value)):
+            await store(key, value, ttl)
+        return value
+    finally:
+        if locked:
+            await asyncio.to_thread(backend.release_lock, key, owner)
+
+
+async def _detached(
+    key: str,
+    producer: Callable[[], Awaitable[Any]],
+    ttl: Optional[float],
+    cache_if: Optional[Callable[[Any], bool]],
+) -> Any:
+    # The task runs in its own copy of the context, so this only frees the
+    # shared fill from the deadline of whichever request happened to start it.
+    deadlines.clear_deadline()
+    return await _produce_once(key, producer, ttl, cache_if)
+
+
+async def get_or_create(
+    key: str,
+    producer: Callable[[], Awaitable[Any]],
+    ttl: Optional[float] = SHARED_CACHE_TTL_SECONDS,
+    detach: bool = True,
+    cache_if: Optional[Callable[[Any], bool]] = None,
+    share: bool = True,
+) -> Any:
+    """
+    Return the cached JSON value for `key`, or run `producer` exactly once
+    across coroutines in this worker and across worker processes, storing
+    its result for everyone else.
+
+    With detach=True the producer keeps running to fill the cache even if
+    the caller is cancelled. With detach=False it runs in the caller and is
+    cancelled with it; concurrent callers still wait on the shared lock.
+    Results for which cache_if returns False are returned but not stored.
+
+    With share=False the caller neither joins nor publishes an in-process
+    fill, for results that may only suit this caller (e.g. an answer degraded
+    by its own token budget). Stored values are still shared.
+    """
+    if not detach:
+        return await _produce_once(key, producer, ttl, cache_if)
+    if not share:
+        return await asyncio.shield(
+            asyncio.create_task(_detached(key, producer, ttl, cache_if))
+        )
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_detached(key, producer, ttl, cache_if))
+        _inflight[key] = task
+        task.add_done_callback(lambda _t: _inflight.pop(key, None))
+    return await asyncio.shield(task)
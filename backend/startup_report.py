@@ -0,0 +1,79 @@
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Imported first by app.py, so this marks the start of the app's own import.
+MODULE_LOAD_STARTED = time.perf_counter()
+
+COLD_START_BUDGET_MS = float(os.getenv("COLD_START_BUDGET_MS", 1500))
+
+_app_ready_ms: Optional[float] = None
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(\S+)")
+
+
+def mark_app_ready() -> float:
+    """Record how long app.py took from its first import to serving."""
+    global _app_ready_ms
+    if _app_ready_ms is None:
+        _app_ready_ms = round((time.perf_counter() - MODULE_LOAD_STARTED) * 1000, 2)
+    return _app_ready_ms
+
+
+def runtime_report() -> Dict[str, object]:
+    from azure_adapters import IMPORT_COSTS
+
+    return {
+        "app_ready_ms": _app_ready_ms,
+        "budget_ms": COLD_START_BUDGET_MS,
+        "within_budget": _app_ready_ms is None or _app_ready_ms <= COLD_START_BUDGET_MS,
+        "lazy_sdk_imports_ms": dict(IMPORT_COSTS),
+    }
+
+
+def measure_imports(module: str = "app") -> List[Tuple[str, float, float]]:
+    """
+    Import `module` in a fresh interpreter with -X importtime and return
+    (module, self_ms, cumulative_ms) for every module it pulled in.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+    rows: List[Tuple[str, float, float]] = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, name = match.groups()
+            rows.append((name, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return rows
+
+
+def main() -> int:
+    module = sys.argv[1] if len(sys.argv) > 1 else "app"
+    rows = measure_imports(module)
+    total = next((cum for name, _, cum in rows if name == module), 0.0)
+    top_level = {name.split(".")[0] for name, _, _ in rows}
+    by_package = {
+        pkg: sum(self_ms for name, self_ms, _ in rows if name.split(".")[0] == pkg)
+        for pkg in top_level
+    }
+    print(f"Import of '{module}': {total:.1f} ms (budget {COLD_START_BUDGET_MS:.0f} ms)")
+    print("Slowest packages (self time):")
+    for pkg, ms in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:15]:
+        print(f"  {ms:8.1f} ms  {pkg}")
+    if total > COLD_START_BUDGET_MS:
+        print("Cold start is over budget.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Prompt/completion token accounting for Azure OpenAI calls, attributed to the
+# endpoint, chat intent and client that caused them, with optional
+# rolling-window budgets. Usage is counted per worker process.
+#
+# Scopes:   "*"                     everything
+#           "endpoint:<name>"       e.g. endpoint:explain_policy
+#           "intent:<endpoint>/<intent>"  e.g. intent:chat/policy_explanation
+#           "client:<id>"           from the X-Client-Id header
+#           "client:ip:<address>"   the caller's address, charged on every request
+#           "deployment:<name>"     reporting only
+#
+# TOKEN_BUDGETS sets per-window limits as comma-separated scope=tokens pairs,
+# e.g. "*=2000000,endpoint:explain_policy=300000,intent:chat/action=50000".
+USAGE_WINDOW_SECONDS = float(os.getenv("USAGE_WINDOW_SECONDS", 3600))
+# Limit applied to every client without its own "client:<id>" entry; 0 = none.
+# X-Client-Id is chosen by the caller, so each request is also charged to its
+# address; dropping or rotating the header doesn't reset the limit. Callers
+# behind a shared NAT share that address's budget; raise it with an explicit
+# "client:ip:<address>" entry. Only requests with no known address fall into
+# "client:anonymous", which is exempt so it doesn't become a global ceiling.
+TOKEN_BUDGET_PER_CLIENT = int(os.getenv("TOKEN_BUDGET_PER_CLIENT", 0))
+# Sent as X-Admin-Key to see per-client usage on /usage; unset hides it.
+USAGE_ADMIN_KEY = os.getenv("USAGE_ADMIN_KEY")
+# Past this share of a budget, completions use a smaller max_tokens and the
+# fallback deployment; past the whole budget they use the degraded answer.
+TOKEN_BUDGET_SOFT_RATIO = float(os.getenv("TOKEN_BUDGET_SOFT_RATIO", 0.8))
+TOKEN_BUDGET_MAX_TOKENS_RATIO = float(os.getenv("TOKEN_BUDGET_MAX_TOKENS_RATIO", 0.5))
+
+CLIENT_ID_HEADER = "x-client-id"
+FORWARDED_FOR_HEADER = "x-forwarded-for"
+_BUCKET_SECONDS = 60
+_ANONYMOUS = "anonymous"
+_REPORT_TOP_CLIENTS = 20
+
+OK = "ok"
+SOFT_LIMIT = "soft_limit"
+EXHAUSTED = "exhausted"
+_LEVEL_ORDER = {OK: 0, SOFT_LIMIT: 1, EXHAUSTED: 2}
+
+
+def _parse_budgets(raw: str) -> Dict[str, int]:
+    budgets: Dict[str, int] = {}
+    for pair in raw.split(","):
+        scope, _, limit = pair.strip().rpartition("=")
+        if scope and limit.strip().isdigit():
+            budgets[scope.strip()] = int(limit)
+    return budgets
+
+
+TOKEN_BUDGETS = _parse_budgets(os.getenv("TOKEN_BUDGETS", ""))
+
+_endpoint: contextvars.ContextVar[str] = contextvars.ContextVar("usage_endpoint", default="other")
+_intent: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("usage_intent", default=None)
+_client: contextvars.ContextVar[str] = contextvars.ContextVar("usage_client", default=_ANONYMOUS)
+_address: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("usage_address", default=None)
+
+
+def attribute(
+    endpoint: str, client_id: Optional[str] = None, address: Optional[str] = None
+) -> None:
+    """
+    Charge completions made from this context (and tasks it starts, such as
+    shared-cache fills) to `endpoint`, `client_id` and the caller's `address`.
+    Without a client id, the address stands in for it.
+    """
+    _endpoint.set(endpoint)
+    _intent.set(None)
+    address_scope = f"ip:{address}" if address else None
+    _address.set(address_scope)
+    client_id = (client_id or "").strip()[:64]
+    if client_id or address_scope:
+        _client.set(client_id or address_scope)
+
+
+def _strip_port(address: str) -> str:
+    if address.startswith("["):
+        # [2001:db8::1]:443
+        return address[1:].partition("]")[0]
+    if address.count(":") == 1:
+        return address.partition(":")[0]
+    return address
+
+
+def client_address(request: Any) -> Optional[str]:
+    """
+    The caller's address. Behind the App Service front end that is the last
+    X-Forwarded-For entry, the one the proxy appended; earlier entries come
+    from the caller and can't be trusted.
+    """
+    forwarded = request.headers.get(FORWARDED_FOR_HEADER)
+    if forwarded:
+        address = _strip_port(forwarded.split(",")[-1].strip())
+        if address:
+            return address[:64]
+    client = getattr(request, "client", None)
+    return getattr(client, "host", None) or None
+
+
+def attribute_request(endpoint: str, request: Any) -> None:
+    attribute(endpoint, request.headers.get(CLIENT_ID_HEADER), client_address(request))
+
+
+def set_intent(intent: str) -> None:
+    _intent.set(intent)
+
+
+def _client_scopes() -> List[str]:
+    client, address = f"client:{_client.get()}", _address.get()
+    scopes = [client]
+    if address and f"client:{address}" != client:
+        scopes.append(f"client:{address}")
+    return scopes
+
+
+def _current_scopes() -> List[str]:
+    endpoint, intent = _endpoint.get(), _intent.get()
+    scopes = ["*", f"endpoint:{endpoint}", *_client_scopes()]
+    if intent:
+        scopes.append(f"intent:{endpoint}/{intent}")
+    return scopes
+
+
+# scope -> buckets of [bucket_start, prompt_tokens, completion_tokens, calls]
+_windows: Dict[str, Deque[List[float]]] = {}
+_lock = threading.Lock()
+_last_sweep = 0.0
+
+
+def _prune(buckets: Deque[List[float]], now: float) -> None:
+    while buckets and buckets[0][0] <= now - USAGE_WINDOW_SECONDS:
+        buckets.popleft()
+
+
+def _totals(scope: str, now: float) -> Tuple[int, int, int]:
+    buckets = _windows.get(scope)
+    if not buckets:
+        return 0, 0, 0
+    _prune(buckets, now)
+    return (
+        int(sum(b[1] for b in buckets)),
+        int(sum(b[2] for b in buckets)),
+        int(sum(b[3] for b in buckets)),
+    )
+
+
+def _sweep(now: float) -> None:
+    """Forget scopes with nothing left in the window, e.g. clients gone quiet."""
+    global _last_sweep
+    _last_sweep = now
+    for scope in list(_windows):
+        buckets = _windows[scope]
+        _prune(buckets, now)
+        if not buckets:
+            del _windows[scope]
+
+
+def record(prompt_tokens: int, completion_tokens: int, deployment: Optional[str] = None) -> None:
+    now = time.time()
+    bucket_start = now - now % _BUCKET_SECONDS
+    scopes = _current_scopes()
+    if deployment:
+        scopes.append(f"deployment:{deployment}")
+    with _lock:
+        if now - _last_sweep >= _BUCKET_SECONDS:
+            _sweep(now)
+        for scope in scopes:
+            buckets = _windows.setdefault(scope, deque())
+            _prune(buckets, now)
+            if buckets and buckets[-1][0] == bucket_start:
+                bucket = buckets[-1]
+            else:
+                bucket = [bucket_start, 0, 0, 0]
+                buckets.append(bucket)
+            bucket[1] += prompt_tokens
+            bucket[2] += completion_tokens
+            bucket[3] += 1
+
+
+def record_response(response: Any, deployment: Optional[str] = None) -> None:
+    """Record `response.usage` from a chat completion, if it has one."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    record(
+        getattr(usage, "prompt_tokens", 0) or 0,
+        getattr(usage, "completion_tokens", 0) or 0,
+        deployment,
+    )
+
+
+def _limit(scope: str) -> Optional[int]:
+    limit = TOKEN_BUDGETS.get(scope)
+    if (
+        limit is None
+        and TOKEN_BUDGET_PER_CLIENT > 0
+        and scope.startswith("client:")
+        and scope != f"client:{_ANONYMOUS}"
+    ):
+        limit = TOKEN_BUDGET_PER_CLIENT
+    return limit
+
+
+def _level(used: int, limit: int) -> str:
+    if used >= limit:
+        return EXHAUSTED
+    if used >= limit * TOKEN_BUDGET_SOFT_RATIO:
+        return SOFT_LIMIT
+    return OK
+
+
+def _worst_level(scopes: List[str]) -> str:
+    if not TOKEN_BUDGETS and TOKEN_BUDGET_PER_CLIENT <= 0:
+        return OK
+    now = time.time()
+    worst = OK
+    with _lock:
+        for scope in scopes:
+            limit = _limit(scope)
+            if limit is None:
+                continue
+            prompt, completion, _ = _totals(scope, now)
+            level = _level(prompt + completion, limit)
+            if _LEVEL_ORDER[level] > _LEVEL_ORDER[worst]:
+                worst = level
+    return worst
+
+
+def budget_level() -> str:
+    """The tightest budget state among the scopes of the current context."""
+    return _worst_level(_current_scopes())
+
+
+def client_budget_level() -> str:
+    """
+    Budget state of the current client alone. Work done while this is not OK
+    may be degraded for this client only, so it shouldn't be shared with
+    other clients' concurrent requests.
+    """
+    return _worst_level(_client_scopes())
+
+
+def downgraded_max_tokens(max_tokens: int) -> int:
+    return max(64, int(max_tokens * TOKEN_BUDGET_MAX_TOKENS_RATIO))
+
+
+def report(include_clients: bool = False) -> Dict[str, Any]:
+    """
+    Usage in the current window. Per-client usage names other callers, so it
+    is only included when `include_clients` is set (the caller is an admin).
+    """
+    now = time.time()
+    by_kind: Dict[str, Dict[str, Dict[str, int]]] = {
+        "endpoint": {},
+        "intent": {},
+        "client": {},
+        "deployment": {},
+    }
+    budgets = []
+    with _lock:
+        _sweep(now)
+        for scope in list(_windows):
+            prompt, completion, calls = _totals(scope, now)
+            kind, _, name = scope.partition(":")
+            if kind in by_kind:
+                by_kind[kind][name] = {
+                    "prompt_tokens": prompt,
+                    "completion_tokens": completion,
+                    "total_tokens": prompt + completion,
+                    "calls": calls,
+                }
+        total_prompt, total_completion, total_calls = _totals("*", now)
+        for scope, limit in sorted(TOKEN_BUDGETS.items()):
+            prompt, completion, _ = _totals(scope, now)
+            budgets.append(
+                {
+                    "scope": scope,
+                    "limit": limit,
+                    "used": prompt + completion,
+                    "state": _level(prompt + completion, limit),
+                }
+            )
+    result = {
+        "window_seconds": USAGE_WINDOW_SECONDS,
+        "total": {
+            "prompt_tokens": total_prompt,
+            "completion_tokens": total_completion,
+            "total_tokens": total_prompt + total_completion,
+            "calls": total_calls,
+        },
+        "by_endpoint": by_kind["endpoint"],
+        "by_intent": by_kind["intent"],
+        "by_deployment": by_kind["deployment"],
+        "clients": len(by_kind["client"]),
+        "per_client_limit": TOKEN_BUDGET_PER_CLIENT or None,
+        "budgets": budgets,
+    }
+    if include_clients:
+        top_clients = sorted(
+            by_kind["client"].items(), key=lambda item: item[1]["total_tokens"], reverse=True
+        )[:_REPORT_TOP_CLIENTS]
+        result["top_clients"] = dict(top_clients)
+    return result
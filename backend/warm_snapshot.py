@@ -0,0 +1,171 @@
+import asyncio
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Snapshot of warm caches that a fresh instance loads before serving, so a
+# scale-out event doesn't start every new instance from cold caches.
+#
+# WARM_SNAPSHOT_PATH must point at storage every instance mounts (e.g. the
+# persistent /home share on Azure App Service, or an Azure Files volume). A
+# new instance starts with an empty local disk, so a snapshot in /tmp would
+# only ever be read back by the host that wrote it. Unset disables snapshots.
+WARM_SNAPSHOT_PATH = os.getenv("WARM_SNAPSHOT_PATH")
+WARM_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("WARM_SNAPSHOT_INTERVAL_SECONDS", 300))
+
+# File layout: magic, format version, header length, JSON header, then one
+# zlib-compressed JSON blob per section. The header maps each section to its
+# (offset, length) so a reader can mmap the file and inflate only what it needs.
+_MAGIC = b"CCWS"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<4sHI")
+
+_sections: Dict[str, Tuple[Callable[[], Any], Callable[[Any], None]]] = {}
+
+
+def register_section(
+    name: str, dump: Callable[[], Any], load: Callable[[Any], None]
+) -> None:
+    """
+    Add a cache to the snapshot. `dump` returns JSON-serializable state and
+    `load` merges that state back in on a new instance.
+    """
+    _sections[name] = (dump, load)
+
+
+# Held for the life of the worker that wins it; see _is_writer.
+_writer_lock_fd: Optional[int] = None
+
+
+def _is_writer(path: str) -> bool:
+    """
+    Only one worker per host writes the snapshot: whichever holds an
+    exclusive lock on `<path>.lock`. If that worker exits, the lock is
+    released and the next worker to try takes over.
+    """
+    global _writer_lock_fd
+    if _writer_lock_fd is not None or fcntl is None:
+        return True
+    fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    _writer_lock_fd = fd
+    return True
+
+
+def save(path: Optional[str] = WARM_SNAPSHOT_PATH) -> int:
+    """
+    Write every registered section atomically; returns bytes written, or 0
+    when snapshots are disabled or another worker is the writer.
+    """
+    if not path or not _is_writer(path):
+        return 0
+    blobs: Dict[str, bytes] = {}
+    for name, (dump, _) in _sections.items():
+        blobs[name] = zlib.compress(
+            json.dumps(dump(), separators=(",", ":")).encode("utf-8")
+        )
+
+    offset = 0
+    index: Dict[str, Tuple[int, int]] = {}
+    for name, blob in blobs.items():
+        index[name] = (offset, len(blob))
+        offset += len(blob)
+    header = json.dumps({"created_at": time.time(), "sections": index}).encode("utf-8")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".warm-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREAMBLE.pack(_MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            for blob in blobs.values():
+                f.write(blob)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return _PREAMBLE.size + len(header) + offset
+
+
+def restore(path: Optional[str] = WARM_SNAPSHOT_PATH) -> Dict[str, Any]:
+    """
+    Load the sections we know about from a snapshot. Missing, truncated or
+    corrupt files, other format versions and unknown sections are skipped
+    rather than failing startup.
+    """
+    if not path:
+        return {"loaded": [], "reason": "WARM_SNAPSHOT_PATH not set"}
+    if not os.path.isfile(path) or os.path.getsize(path) < _PREAMBLE.size:
+        return {"loaded": [], "reason": "no snapshot"}
+
+    loaded = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        magic, version, header_len = _PREAMBLE.unpack_from(view, 0)
+        if magic != _MAGIC or version != FORMAT_VERSION:
+            return {"loaded": [], "reason": f"unsupported snapshot version {version}"}
+        body_start = _PREAMBLE.size + header_len
+        try:
+            header = json.loads(bytes(view[_PREAMBLE.size:body_start]))
+            sections = [
+                (str(name), int(offset), int(length))
+                for name, (offset, length) in header["sections"].items()
+            ]
+        except (ValueError, TypeError, KeyError, AttributeError) as exc:
+            return {"loaded": [], "reason": f"corrupt snapshot header: {exc}"}
+        for name, offset, length in sections:
+            section = _sections.get(name)
+            if section is None:
+                continue
+            start = body_start + offset
+            try:
+                state = json.loads(zlib.decompress(view[start:start + length]))
+                section[1](state)
+            except Exception:
+                # A corrupt section only costs us that cache.
+                continue
+            loaded.append(name)
+    return {"loaded": loaded, "created_at": header.get("created_at")}
+
+
+async def run_periodic(
+    interval: float = WARM_SNAPSHOT_INTERVAL_SECONDS, path: Optional[str] = WARM_SNAPSHOT_PATH
+) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(save, path)
+        except Exception:
+            # Snapshots are best-effort; try again next interval.
+            continue
+
+
+_periodic_task: Optional["asyncio.Task[None]"] = None
+
+
+def start_periodic() -> None:
+    global _periodic_task
+    if _periodic_task is None and WARM_SNAPSHOT_PATH and WARM_SNAPSHOT_INTERVAL_SECONDS > 0:
+        _periodic_task = asyncio.create_task(run_periodic())
+
+
+async def stop_periodic() -> None:
+    global _periodic_task
+    if _periodic_task is not None:
+        _periodic_task.cancel()
+        _periodic_task = None
+    await asyncio.to_thread(save)
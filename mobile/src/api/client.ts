@@ -2,6 +2,7 @@
 import {
   Story,
   StoryDetail,
+  ReadingLevel,
   ExplainPolicyResponse,
   TakeActionResponse,
   ChatResponse,
@@ -13,6 +14,14 @@ export const API_BASE_URL =
   "https://civiccompanion-backend-eqfgdybbdsawbzcx.canadacentral-01.azurewebsites.net";
   //"http://192.168.1.27:8000"
 
+// Time budget the backend may spend on a request before giving up. Leaving a
+// screen aborts the fetch, which lets the backend cancel the work as well.
+export const REQUEST_DEADLINE_MS = 25000;
+
+function deadlineHeaders(): Record<string, string> {
+  return { "X-Request-Deadline-Ms": String(REQUEST_DEADLINE_MS) };
+}
+
 async function handleResponse<T>(res: Response): Promise<T> {
   if (!res.ok) {
     const text = await res.text();
@@ -28,23 +37,48 @@ export async function fetchStories(): Promise<Story[]> {
 
 export async function fetchStoryDetail(
   storyId: string,
-  opts?: { reading_level?: string }
+  opts?: { reading_level?: ReadingLevel; signal?: AbortSignal }
 ): Promise<StoryDetail> {
   const query = opts?.reading_level
     ? `?reading_level=${encodeURIComponent(opts.reading_level)}`
     : "";
-  const res = await fetch(`${API_BASE_URL}/stories/${storyId}${query}`);
+  const res = await fetch(`${API_BASE_URL}/stories/${storyId}${query}`, {
+    headers: deadlineHeaders(),
+    signal: opts?.signal,
+  });
   return handleResponse<StoryDetail>(res);
 }
 
+// Ask the backend to warm story details in the background; fire-and-forget.
+export async function prefetchStoryDetails(
+  storyIds: string[],
+  readingLevels: ReadingLevel[] = ["default"]
+): Promise<void> {
+  if (storyIds.length === 0) return;
+  try {
+    await fetch(`${API_BASE_URL}/stories/prefetch`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        story_ids: storyIds,
+        reading_levels: readingLevels,
+      }),
+    });
+  } catch {
+    // Prefetching is only an optimisation.
+  }
+}
+
 export async function explainPolicy(params: {
   policy_id: string;
   user_role?: string;
   language?: string;
+  signal?: AbortSignal;
 }): Promise<ExplainPolicyResponse> {
   const res = await fetch(`${API_BASE_URL}/explain-policy`, {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
+    headers: { "Content-Type": "application/json", ...deadlineHeaders() },
+    signal: params.signal,
     body: JSON.stringify({
       policy_id: params.policy_id,
       user_role: params.user_role ?? "general",
@@ -75,10 +109,12 @@ export async function sendChat(params: {
   message: string;
   conversation_id?: string | null;
   metadata?: Record<string, unknown>;
+  signal?: AbortSignal;
 }): Promise<ChatResponse> {
   const res = await fetch(`${API_BASE_URL}/chat`, {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
+    headers: { "Content-Type": "application/json", ...deadlineHeaders() },
+    signal: params.signal,
     body: JSON.stringify({
       message: params.message,
       conversation_id: params.conversation_id ?? null,
@@ -49,6 +49,10 @@ const ChatScreen: React.FC = () => {
   const [conversationId, setConversationId] = useState<string | null>(null);
   const route = useRoute<RouteProp<RootTabParamList, "Chat">>();
   const inputRef = useRef<TextInput>(null);
+  const chatController = useRef<AbortController | null>(null);
+
+  // Cancel an in-flight answer when the user leaves the chat.
+  useEffect(() => () => chatController.current?.abort(), []);
 
   useEffect(() => {
     (async () => {
@@ -91,11 +95,14 @@ const ChatScreen: React.FC = () => {
     setInput("");
 
     setSending(true);
+    const controller = new AbortController();
+    chatController.current = controller;
     try {
       const res = await sendChat({
         message: userText,
         conversation_id: nextConversationId,
         metadata: selectedPolicyId ? { policy_id: selectedPolicyId } : {},
+        signal: controller.signal,
       });
 
       setConversationId(res.conversation_id ?? nextConversationId);
@@ -109,6 +116,7 @@ const ChatScreen: React.FC = () => {
       };
       setMessages((prev) => [...prev, botMessage]);
     } catch (err: any) {
+      if (controller.signal.aborted) return;
       const botError: ChatMessage = {
         id: `b-${Date.now()}`,
         from: "bot",
@@ -1,5 +1,5 @@
 // src/screens/StoriesScreen.tsx
-import React, { useEffect, useState, useRef } from "react";
+import React, { useEffect, useState, useRef, useCallback } from "react";
 import { useNavigation } from "@react-navigation/native";
 import { NativeStackNavigationProp } from "@react-navigation/native-stack";
 import { RootStackParamList } from "../../App";
@@ -11,8 +11,9 @@ import {
   FlatList,
   RefreshControl,
   Animated,
+  ViewToken,
 } from "react-native";
-import { fetchStories } from "../api/client";
+import { fetchStories, prefetchStoryDetails } from "../api/client";
 import { Story } from "../types";
 import StoryCard from "../components/StoryCard";
 
@@ -24,6 +25,23 @@ const StoriesScreen: React.FC = () => {
   const navigation = useNavigation<NativeStackNavigationProp<RootStackParamList>>();
 
   const blinkAnim = useRef(new Animated.Value(1)).current;
+  const prefetched = useRef(new Set<string>());
+
+  // Warm details for stories as they scroll into view so a tap is a cache hit.
+  const onViewableItemsChanged = useCallback(
+    ({ viewableItems }: { viewableItems: ViewToken[] }) => {
+      const ids = viewableItems
+        .map((token) => (token.item as Story).id)
+        .filter((id) => !prefetched.current.has(id));
+      ids.forEach((id) => prefetched.current.add(id));
+      prefetchStoryDetails(ids);
+    },
+    []
+  );
+  const viewabilityConfig = useRef({
+    itemVisiblePercentThreshold: 50,
+    minimumViewTime: 300,
+  }).current;
 
   useEffect(() => {
     Animated.loop(
@@ -79,6 +97,8 @@ const StoriesScreen: React.FC = () => {
         data={stories}
         keyExtractor={(item) => item.id}
         contentContainerStyle={styles.listContent}
+        onViewableItemsChanged={onViewableItemsChanged}
+        viewabilityConfig={viewabilityConfig}
         refreshControl={
           <RefreshControl
             refreshing={refreshing}
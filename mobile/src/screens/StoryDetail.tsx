@@ -1,5 +1,5 @@
 // src/screens/StoryDetail.tsx
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import {
   View,
   Text,
@@ -16,7 +16,7 @@ import {
 import { RouteProp, useRoute, useNavigation } from "@react-navigation/native";
 import { NativeStackNavigationProp } from "@react-navigation/native-stack";
 import { RootStackParamList } from "../../App";
-import { fetchStoryDetail } from "../api/client";
+import { fetchStoryDetail, prefetchStoryDetails } from "../api/client";
 import { StoryDetail as StoryDetailType } from "../types";
 
 type StoryDetailRouteProp = RouteProp<RootStackParamList, "StoryDetail">;
@@ -32,17 +32,23 @@ const StoryDetail: React.FC = () => {
   const [noteDraft, setNoteDraft] = useState("");
   const [simplifying, setSimplifying] = useState(false);
   const [isSimplified, setIsSimplified] = useState(false);
+  const simplifyController = useRef<AbortController | null>(null);
 
   useEffect(() => {
     let active = true;
+    const controller = new AbortController();
     (async () => {
       try {
         setError(null);
         setLoading(true);
-        const data = await fetchStoryDetail(storyId);
+        const data = await fetchStoryDetail(storyId, {
+          signal: controller.signal,
+        });
         if (active) {
           setDetail(data);
           setIsSimplified(false);
+          // Have the simplified version ready if the reader asks for it.
+          prefetchStoryDetails([storyId], ["simple"]);
         }
       } catch (err: any) {
         if (active) {
@@ -57,17 +63,26 @@ const StoryDetail: React.FC = () => {
 
     return () => {
       active = false;
+      // Leaving the screen cancels the request so the backend can stop too.
+      controller.abort();
+      simplifyController.current?.abort();
     };
   }, [storyId]);
 
   const handleSimplify = async () => {
     if (simplifying) return;
+    const controller = new AbortController();
+    simplifyController.current = controller;
     try {
       setSimplifying(true);
-      const data = await fetchStoryDetail(storyId, { reading_level: "simple" });
+      const data = await fetchStoryDetail(storyId, {
+        reading_level: "simple",
+        signal: controller.signal,
+      });
       setDetail(data);
       setIsSimplified(true);
     } catch (err: any) {
+      if (controller.signal.aborted) return;
       setError(err.message ?? "Couldn't simplify this story.");
     } finally {
       setSimplifying(false);
@@ -12,6 +12,8 @@ export interface StoryDetail extends Story {
   detailed_summary: string;
 }
 
+export type ReadingLevel = "default" | "simple";
+
 export interface ExplainPolicyResponse {
   policy_title: string;
   what_it_is: string;
@@ -19,10 +21,21 @@ export interface ExplainPolicyResponse {
   disclaimer: string;
 }
 
+export interface ActionResource {
+  id: string;
+  name: string;
+  kind: "organization" | "office" | "event" | string;
+  url?: string | null;
+  description?: string | null;
+  distance_km?: number | null;
+  starts_at?: string | null;
+}
+
 export interface TakeActionResponse {
   policy_title: string;
   actions: string[];
   disclaimer: string;
+  resources?: ActionResource[];
 }
 
 export interface ShortVideo {